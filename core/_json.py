@@ -0,0 +1,53 @@
+# /core/_json.py
+"""
+Shared JSON codec for the subchat modules.
+
+orjson is used when installed; otherwise everything falls back to the
+stdlib json module with matching output (UTF-8 bytes, non-ASCII kept,
+compact unless `pretty`). Non-string dict keys are stringified either way.
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+
+def dumps(
+    obj: Any,
+    pretty: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    newline: bool = False,
+) -> bytes:
+    """
+    Serialize `obj` to UTF-8 JSON bytes.
+
+    pretty: indent by two spaces.
+    default: called for objects the encoder can't represent.
+    newline: append a trailing newline (one NDJSON record).
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, default=default, option=option)
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+    data = text.encode("utf-8")
+    return data + b"\n" if newline else data
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes, str or a buffer (memoryview over an mmap)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
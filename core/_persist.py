@@ -0,0 +1,112 @@
+# /core/_persist.py
+"""
+Shared persistence helpers for the subchat stores.
+
+- atomic_write(): fsync a sibling temp file, then os.replace() it over the target.
+- synchronized: run a method under the instance's `_lock`.
+- DebouncedWriter: coalesce bursts of save requests into one write per delay.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Callable, Optional
+
+TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def atomic_write(path: Path, content: bytes) -> None:
+    """
+    Write file atomically to reduce corruption risk: fsync a sibling temp
+    file, then os.replace() it over the target (atomic on one filesystem).
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        fd = os.open(tmp_path, TMP_FLAGS, 0o644)
+        try:
+            os.write(fd, content)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def synchronized(method):
+    """Run a method under the instance's `_lock`."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Every live DebouncedWriter; flushed once by a single atexit hook.
+_WRITERS: "weakref.WeakSet[DebouncedWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all_at_exit() -> None:
+    for writer in list(_WRITERS):
+        writer.flush()
+
+
+class DebouncedWriter:
+    """
+    Call `write` at most once per `delay` seconds for any burst of schedule()
+    calls. A one-shot daemon Timer is armed per burst, so an idle writer keeps
+    no thread alive; pending work is flushed at interpreter exit.
+
+    Lock order: the writer's write lock -> the owner's locks (taken inside
+    `write`) -> the writer's state lock. schedule() and discard() only take
+    the state lock, so owners may call them while holding their own locks;
+    flush() waits for an in-flight write and must not be called under them.
+    """
+
+    def __init__(self, delay: float, write: Callable[[], None]):
+        self.delay = delay
+        self._write = write
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        # Held across `write`, so flush() can't return (and the process can't
+        # exit) while a timer thread is still in the middle of a write.
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        _WRITERS.add(self)
+
+    def schedule(self) -> None:
+        """Mark dirty and arm the timer unless one is already pending."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._fire)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def discard(self) -> None:
+        """Forget the pending write; for owners that just wrote everything themselves."""
+        with self._lock:
+            self._dirty = False
+
+    def _fire(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                dirty, self._dirty = self._dirty, False
+            if dirty:
+                self._write()
+
+    def flush(self) -> None:
+        """Run the pending write now, if any."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self._fire()
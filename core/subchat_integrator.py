@@ -19,53 +19,47 @@ the existing PRIMUS codebase and will degrade gracefully if optional modules are
 
 from __future__ import annotations
 
+import importlib
+import importlib.util
 import os
+import sys
 import time
-import json
 import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional, List
 
+from core._json import dumps as _dumps
+
 # Defensive imports: many modules live in core/ or project root depending on earlier steps.
-try:
-    from core.subchat_manager import SubchatManager
-except Exception:
-    SubchatManager = None
-
-try:
-    from core.subchat_runtime import SubchatRuntime
-except Exception:
-    SubchatRuntime = None
-
-try:
-    from core.subchat_router import SubchatRouter
-except Exception:
-    SubchatRouter = None
-
-try:
-    from core.subchat_bridge import SubchatBridge
-except Exception:
-    SubchatBridge = None
-
-try:
-    from core.agent_manager import AgentManager
-except Exception:
-    AgentManager = None
+def _try_import(name: str, attr: str):
+    """
+    Return `attr` from module `name`, or None if the module is absent.
+    Absent modules are detected with find_spec, so the common "not installed"
+    case costs no raised-and-caught ImportError.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    try:
+        return getattr(importlib.import_module(name), attr, None)
+    except Exception:
+        return None
+
+
+SubchatManager = _try_import("core.subchat_manager", "SubchatManager")
+SubchatRuntime = _try_import("core.subchat_runtime", "SubchatRuntime")
+SubchatRouter = _try_import("core.subchat_router", "SubchatRouter")
+SubchatBridge = _try_import("core.subchat_bridge", "SubchatBridge")
+AgentManager = _try_import("core.agent_manager", "AgentManager")
 
 # Top-level utilities
-try:
-    from agent_interaction_logger import AgentInteractionLogger
-except Exception:
-    AgentInteractionLogger = None
-
-try:
-    from agent_permissions import AgentPermissions
-except Exception:
-    AgentPermissions = None
-
-try:
-    from agent_messaging import AgentMessaging
-except Exception:
-    AgentMessaging = None
+AgentInteractionLogger = _try_import("agent_interaction_logger", "AgentInteractionLogger")
+AgentPermissions = _try_import("agent_permissions", "AgentPermissions")
+AgentMessaging = _try_import("agent_messaging", "AgentMessaging")
 
 # Simple fallback logger if module not present
 def _simple_logger(path: Optional[str] = None):
@@ -82,6 +76,27 @@ def _simple_logger(path: Optional[str] = None):
 
 _log = _simple_logger()
 
+# Interaction type tags: a small closed set, interned so hot-path compares are
+# pointer compares, each with a stable integer id written alongside the tag.
+_T_USER_TO_SUBCHAT = sys.intern("user->subchat")
+_T_AGENT_TO_SUBCHAT = sys.intern("agent->subchat")
+_T_AGENT_POST = sys.intern("agent->subchat_post")
+_TYPE_IDS = {
+    sys.intern(k): i
+    for i, k in enumerate((_T_USER_TO_SUBCHAT, _T_AGENT_TO_SUBCHAT, _T_AGENT_POST))
+}
+
+# Immutable snapshot of the component wiring. Hot paths load it once
+# (w = self._wiring) and always see a coherent set of components; rewire()
+# publishes a new snapshot with a single attribute assignment.
+_Wiring = namedtuple(
+    "_Wiring",
+    ("subchat_manager", "runtime", "router", "bridge", "agent_manager",
+     "permissions", "messaging", "interaction_logger"),
+)
+
+_HEALTH_COMPONENTS = ("subchat_manager", "runtime", "router", "bridge", "agent_manager", "permissions", "messaging")
+
 
 class SubchatIntegrator:
     """
@@ -112,14 +127,89 @@ class SubchatIntegrator:
         self._running = False
         self._lock = threading.RLock()
 
+        self._publish_wiring(_Wiring(
+            subchat_manager=self.subchat_manager,
+            runtime=self.runtime,
+            router=self.router,
+            bridge=self.bridge,
+            agent_manager=self.agent_manager,
+            permissions=self.permissions,
+            messaging=self.messaging,
+            interaction_logger=self.interaction_logger,
+        ))
+        self._max_agents_cached = self.config.get("max_agents_per_subchat", 2)
+
         _log(f"Components: subchat_manager={bool(self.subchat_manager)}, "
              f"runtime={bool(self.runtime)}, router={bool(self.router)}, bridge={bool(self.bridge)}, "
              f"agent_manager={bool(self.agent_manager)}, permissions={bool(self.permissions)}, "
              f"messaging={bool(self.messaging)}, interaction_logger={bool(self.interaction_logger)}")
 
+    def _publish_wiring(self, wiring: "_Wiring"):
+        # Component wiring only changes through here, so the health component
+        # map is computed once per wiring and reused by health().
+        self._components = tuple((n, getattr(wiring, n)) for n in _HEALTH_COMPONENTS)
+        self._health_components = {n: c is not None for n, c in self._components}
+
+        # Resolve the permission and interaction-log branches once per wiring
+        # instead of re-testing for a missing module on every request.
+        if wiring.permissions is None:
+            _log("No AgentPermissions module available — default deny for safety.")
+            self._enforce_permissions = self._deny_permissions
+        else:
+            self.__dict__.pop("_enforce_permissions", None)
+        if wiring.interaction_logger is None:
+            self._interaction_log_path = os.path.join(os.getcwd(), "core", "agent_interactions.log")
+            self._write_interaction = self._write_interaction_to_file
+        else:
+            self._write_interaction = wiring.interaction_logger.log
+
+        self._wiring = wiring
+
+    def rewire(self, **components: Any) -> None:
+        """
+        Replace one or more components at runtime, e.g. rewire(router=new_router).
+        Builds a new wiring snapshot and publishes it atomically.
+        """
+        with self._lock:
+            wiring = self._wiring._replace(**components)
+            for name, comp in components.items():
+                setattr(self, name, comp)
+            self._publish_wiring(wiring)
+            _log(f"Rewired components: {', '.join(components)}")
+
     # -------------------------
     # Lifecycle
     # -------------------------
+    # Components in the same phase are independent and are started/stopped
+    # concurrently; phases run in order (bridge/router stop before runtime).
+    def _start_phases(self):
+        w = self._wiring
+        return ((w.subchat_manager, w.runtime), (w.router, w.bridge, w.agent_manager))
+
+    def _stop_phases(self):
+        w = self._wiring
+        return ((w.bridge, w.router), (w.runtime, w.subchat_manager, w.agent_manager))
+
+    @staticmethod
+    def _safe_call(comp: Any, method: str):
+        try:
+            getattr(comp, method)()
+            done = "Started" if method == "start" else "Stopped"
+            _log(f"{done} component: {comp.__class__.__name__}")
+        except Exception as e:
+            _log(f"Warning: failed to {method} {comp}: {e}")
+
+    def _run_phases(self, phases, method: str):
+        for phase in phases:
+            comps = [c for c in phase if c and hasattr(c, method)]
+            if len(comps) <= 1:
+                for comp in comps:
+                    self._safe_call(comp, method)
+                continue
+            # total wall time per phase is the slowest component, not the sum
+            with ThreadPoolExecutor(max_workers=len(comps)) as ex:
+                list(ex.map(lambda c: self._safe_call(c, method), comps))
+
     def start(self) -> Dict[str, Any]:
         with self._lock:
             if self._running:
@@ -127,13 +217,7 @@ class SubchatIntegrator:
                 return {"status": "ok", "message": "already_running"}
             _log("Starting SubchatIntegrator...")
             # Start components if they have a start method
-            for comp in (self.subchat_manager, self.runtime, self.router, self.bridge, self.agent_manager):
-                try:
-                    if comp and hasattr(comp, "start"):
-                        comp.start()
-                        _log(f"Started component: {comp.__class__.__name__}")
-                except Exception as e:
-                    _log(f"Warning: failed to start {comp}: {e}")
+            self._run_phases(self._start_phases(), "start")
             self._running = True
             return {"status": "ok"}
 
@@ -143,29 +227,13 @@ class SubchatIntegrator:
                 _log("Integrator not running.")
                 return {"status": "ok", "message": "not_running"}
             _log("Stopping SubchatIntegrator...")
-            for comp in (self.bridge, self.router, self.runtime, self.subchat_manager, self.agent_manager):
-                try:
-                    if comp and hasattr(comp, "stop"):
-                        comp.stop()
-                        _log(f"Stopped component: {comp.__class__.__name__}")
-                except Exception as e:
-                    _log(f"Warning: failed to stop {comp}: {e}")
+            self._run_phases(self._stop_phases(), "stop")
             self._running = False
             return {"status": "ok"}
 
     def health(self) -> Dict[str, Any]:
-        return {
-            "running": self._running,
-            "components": {
-                "subchat_manager": bool(self.subchat_manager),
-                "runtime": bool(self.runtime),
-                "router": bool(self.router),
-                "bridge": bool(self.bridge),
-                "agent_manager": bool(self.agent_manager),
-                "permissions": bool(self.permissions),
-                "messaging": bool(self.messaging),
-            }
-        }
+        # copy so callers (e.g. run_health_check) can't mutate the cached map
+        return {"running": self._running, "components": dict(self._health_components)}
 
     # -------------------------
     # Subchat management
@@ -204,38 +272,53 @@ class SubchatIntegrator:
         action: "read", "write", "create_agent_call", etc.
         """
         _log(f"Permission check: actor={actor} subchat={target_subchat_id} action={action}")
-        if not self.permissions:
+        permissions = self._wiring.permissions
+        if not permissions:
             _log("No AgentPermissions module available — default deny for safety.")
             return False
         try:
-            return self.permissions.is_allowed(actor=actor, subchat_id=target_subchat_id, action=action)
+            return permissions.is_allowed(actor=actor, subchat_id=target_subchat_id, action=action)
         except Exception as e:
             _log(f"Permission check error: {e}")
             return False
 
+    @staticmethod
+    def _deny_permissions(actor: str, target_subchat_id: str, action: str) -> bool:
+        # Installed in place of _enforce_permissions when no permissions module
+        # is wired; the warning is logged once in _publish_wiring.
+        return False
+
     def route_user_to_subchat(self, user_id: str, subchat_id: str, message: str) -> Dict[str, Any]:
         """
         Entry point when a user posts a message into a subchat.
         Responsible for permission checks, routing to runtime/agents, and logging.
         """
+        w = self._wiring
+        router = w.router
+        bridge = w.bridge
+        runtime = w.runtime
+        subchat_manager = w.subchat_manager
+        enforce = self._enforce_permissions
+        max_agents = self._max_agents_cached
+
         _log(f"route_user_to_subchat user={user_id} subchat={subchat_id} msg_len={len(message)}")
-        if not self._enforce_permissions(user_id, subchat_id, "write"):
+        if not enforce(user_id, subchat_id, "write"):
             _log("Permission denied for writing to subchat.")
             return {"status": "error", "error": "permission_denied"}
 
         # Log the incoming user message
-        self._log_interaction("user->subchat", {"user": user_id, "subchat": subchat_id, "text": message})
+        self._log_interaction(_T_USER_TO_SUBCHAT, {"user": user_id, "subchat": subchat_id, "text": message})
 
         # Route via router/bridge to runtime
         try:
-            if self.router:
-                routed = self.router.route_to_runtime(subchat_id=subchat_id, content=message, user=user_id)
+            if router is not None:
+                routed = router.route_to_runtime(subchat_id=subchat_id, content=message, user=user_id)
                 _log(f"Routed via router: {routed}")
-            elif self.bridge:
-                routed = self.bridge.send_to_runtime(subchat_id=subchat_id, content=message, user=user_id)
+            elif bridge is not None:
+                routed = bridge.send_to_runtime(subchat_id=subchat_id, content=message, user=user_id)
                 _log(f"Routed via bridge: {routed}")
-            elif self.runtime:
-                routed = self.runtime.handle_message(subchat_id=subchat_id, user=user_id, text=message)
+            elif runtime is not None:
+                routed = runtime.handle_message(subchat_id=subchat_id, user=user_id, text=message)
                 _log(f"Runtime handled message: {routed}")
             else:
                 _log("No router/bridge/runtime available to handle message.")
@@ -246,15 +329,17 @@ class SubchatIntegrator:
 
         # Optionally auto-invoke agents if subchat rules allow and user requested assist
         try:
-            if self.subchat_manager and self.subchat_manager.should_invoke_agents(subchat_id):
+            if subchat_manager is not None and subchat_manager.should_invoke_agents(subchat_id):
                 # Get allowed agents
-                agents = self.subchat_manager.get_assigned_agents(subchat_id)
-                for ag in agents[: self.config.get("max_agents_per_subchat", 2)]:
-                    # permission check for agent invocation
-                    if not self._enforce_permissions("system", subchat_id, "invoke_agent"):
-                        _log(f"System not allowed to invoke agent {ag}")
-                        continue
-                    self._invoke_agent_via_integrator(agent_name=ag, subchat_id=subchat_id, prompt=message)
+                agents = subchat_manager.get_assigned_agents(subchat_id)[:max_agents]
+                # permission check for agent invocation: same actor/action for
+                # every agent, so it is checked once rather than per agent
+                if agents and not enforce("system", subchat_id, "invoke_agent"):
+                    _log(f"System not allowed to invoke agents {agents}")
+                    agents = ()
+                invoke = self._invoke_agent_via_integrator
+                for ag in agents:
+                    invoke(agent_name=ag, subchat_id=subchat_id, prompt=message)
         except Exception as e:
             _log(f"Agent invocation error: {e}")
 
@@ -265,8 +350,9 @@ class SubchatIntegrator:
         High level helper to ask AgentManager to run an agent on behalf of a subchat.
         The integrator enforces permission checks and logs interactions.
         """
+        agent_manager = self._wiring.agent_manager
         _log(f"Invoking agent: {agent_name} for subchat {subchat_id}")
-        if not self.agent_manager:
+        if agent_manager is None:
             return {"status": "error", "error": "no_agent_manager"}
 
         # permission: can this agent access this subchat's RAG / chunks?
@@ -275,9 +361,9 @@ class SubchatIntegrator:
             return {"status": "error", "error": "agent_permission_denied"}
 
         try:
-            result = self.agent_manager.call_agent(agent_name, {"action": "process_prompt", "subchat_id": subchat_id, "prompt": prompt})
+            result = agent_manager.call_agent(agent_name, {"action": "process_prompt", "subchat_id": subchat_id, "prompt": prompt})
             # log agent response
-            self._log_interaction("agent->subchat", {"agent": agent_name, "subchat": subchat_id, "result": result})
+            self._log_interaction(_T_AGENT_TO_SUBCHAT, {"agent": agent_name, "subchat": subchat_id, "result": result})
             return {"status": "ok", "result": result}
         except Exception as e:
             _log(f"Agent invocation failed: {e}")
@@ -287,6 +373,11 @@ class SubchatIntegrator:
         """
         Called when an agent produces an output that should be posted back into a subchat.
         """
+        w = self._wiring
+        router = w.router
+        bridge = w.bridge
+        runtime = w.runtime
+
         _log(f"route_agent_to_subchat agent={agent_name} subchat={subchat_id} msg_len={len(message)}")
         # permission: can the agent write to this subchat?
         if not self._enforce_permissions(agent_name, subchat_id, "write"):
@@ -295,12 +386,12 @@ class SubchatIntegrator:
 
         # deliver message to runtime/bridge/router
         try:
-            if self.bridge:
-                self.bridge.post_to_subchat(subchat_id=subchat_id, actor=agent_name, text=message)
-            elif self.router:
-                self.router.post(subchat_id=subchat_id, actor=agent_name, text=message)
-            elif self.runtime:
-                self.runtime.inject_agent_message(subchat_id=subchat_id, agent=agent_name, text=message)
+            if bridge is not None:
+                bridge.post_to_subchat(subchat_id=subchat_id, actor=agent_name, text=message)
+            elif router is not None:
+                router.post(subchat_id=subchat_id, actor=agent_name, text=message)
+            elif runtime is not None:
+                runtime.inject_agent_message(subchat_id=subchat_id, agent=agent_name, text=message)
             else:
                 _log("No delivery path available for agent->subchat.")
                 return {"status": "error", "error": "no_delivery_path"}
@@ -309,7 +400,7 @@ class SubchatIntegrator:
             return {"status": "error", "error": str(e)}
 
         # log it
-        self._log_interaction("agent->subchat_post", {"agent": agent_name, "subchat": subchat_id, "text": message})
+        self._log_interaction(_T_AGENT_POST, {"agent": agent_name, "subchat": subchat_id, "text": message})
         return {"status": "ok"}
 
     # -------------------------
@@ -320,19 +411,26 @@ class SubchatIntegrator:
         Central place to record agent/subchat/user interactions.
         If an AgentInteractionLogger is present we use it; otherwise fallback to file logger.
         """
-        entry = {"ts": int(time.time()), "type": typ, "payload": payload}
+        entry = {
+            "ts": time.time_ns() // 1_000_000_000,
+            "type": typ,
+            "type_id": _TYPE_IDS.get(typ, -1),
+            "payload": payload,
+        }
         try:
-            if self.interaction_logger:
-                self.interaction_logger.log(entry)
-            else:
-                # fallback: append to local json lines file
-                logpath = os.path.join(os.getcwd(), "core", "agent_interactions.log")
-                with open(logpath, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._write_interaction(entry)
             _log(f"Logged interaction type={typ}")
         except Exception as e:
             _log(f"Failed to log interaction: {e}")
 
+    def _write_interaction_to_file(self, entry: Dict[str, Any]):
+        # fallback: append to local json lines file
+        with open(self._interaction_log_path, "ab") as f:
+            # two writes avoid concatenating (and so copying) a large
+            # serialized message just to append the newline
+            f.write(_dumps(entry))
+            f.write(b"\n")
+
     # -------------------------
     # Utilities
     # -------------------------
@@ -35,6 +35,14 @@ class SubChatInterface:
         self.normalizer = SubChatNormalizer()
         self.formatter = SubChatFormatter()
 
+        # Resolve the preprocessing stages once so post_message runs a single
+        # flat pass over bound methods instead of re-dispatching per message.
+        self._preprocess = (
+            self.sanitizer.clean,
+            self.filters.apply,
+            self.normalizer.normalize,
+        )
+
     # ----------------------------------------------------------------------
     # PUBLIC SAFE INTERFACE LAYER
     # ----------------------------------------------------------------------
@@ -57,9 +65,8 @@ class SubChatInterface:
         if not self.access.can_post(sender, subchat_id):
             raise PermissionError("Sender not allowed to post to this subchat")
 
-        message = self.sanitizer.clean(message)
-        message = self.filters.apply(message)
-        message = self.normalizer.normalize(message)
+        for stage in self._preprocess:
+            message = stage(message)
 
         reply = self.runtime.process_message(subchat_id, sender, message)
 
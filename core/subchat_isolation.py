@@ -10,7 +10,130 @@ This module is central to PRIMUS Phase 2 (Core Completion).
 
 import os
 import json
-from typing import Optional, Dict, List
+import time
+import shutil
+import threading
+import functools
+import weakref
+from collections import OrderedDict
+from typing import Optional, Dict, List, Iterator, Any
+
+
+# fdatasync is POSIX-only; fall back to a full fsync elsewhere (Windows).
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+_APPEND_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+# Transcript descriptors kept open at once; the least recently written is
+# synced and closed beyond this.
+_MAX_OPEN_FDS = 64
+
+# Every live writer in the process, so a delete or compaction through one
+# manager also closes descriptors other managers cached for the same log
+# (an fd left on a renamed/unlinked file would swallow later appends).
+_WRITERS: "weakref.WeakSet[_GroupCommitWriter]" = weakref.WeakSet()
+# Serializes compaction, crash recovery and deletes across managers. Taken
+# before any writer lock.
+_COMPACT_LOCK = threading.Lock()
+
+
+def _close_everywhere(path: str):
+    """Sync and close every writer's descriptor for `path`."""
+    for writer in list(_WRITERS):
+        writer.close(path)
+
+
+@functools.lru_cache(maxsize=1024)
+def _subchat_path(root: str, folder: str) -> str:
+    """Canonical folder path for a subchat; cached since ids repeat constantly."""
+    return f"{root}/{folder}"
+
+
+def _legacy_record(item: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalize one item from a chat.json list into a transcript record.
+    Records with "content" pass through; other dicts and scalars become their
+    JSON/text form as the content; None is skipped.
+    """
+    if isinstance(item, dict):
+        if "content" in item:
+            return item
+        return {"content": json.dumps(item, ensure_ascii=False)}
+    if item is None:
+        return None
+    return {"content": item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)}
+
+
+class _GroupCommitWriter:
+    """
+    Append-only transcript writer with group commit.
+
+    Every append is a single os.write() on an O_APPEND descriptor, so readers
+    see it immediately. Durability is batched: a background thread fdatasyncs
+    all dirty descriptors once per flush interval instead of once per message.
+    At most `max_open` descriptors stay open (LRU); evicted ones are synced first.
+    """
+
+    def __init__(self, flush_interval_ms: int = 50, max_open: int = _MAX_OPEN_FDS):
+        self.flush_interval = max(flush_interval_ms, 1) / 1000.0
+        self.max_open = max(max_open, 1)
+        self._fds: "OrderedDict[str, int]" = OrderedDict()
+        self._dirty: set = set()
+        self.lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        _WRITERS.add(self)
+
+    def append(self, path: str, data: bytes):
+        with self.lock:
+            fd = self._fds.get(path)
+            if fd is None:
+                while len(self._fds) >= self.max_open:
+                    self._release(*self._fds.popitem(last=False))
+                fd = os.open(path, _APPEND_FLAGS, 0o644)
+                self._fds[path] = fd
+            else:
+                self._fds.move_to_end(path)
+            os.write(fd, data)
+            self._dirty.add(fd)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="subchat-group-commit", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """fdatasync every descriptor written since the last commit."""
+        with self.lock:
+            dirty, self._dirty = self._dirty, set()
+            for fd in dirty:
+                try:
+                    _fdatasync(fd)
+                except OSError:
+                    pass
+
+    def close(self, path: str):
+        """Sync and release the descriptor for `path` (before delete/compaction)."""
+        with self.lock:
+            fd = self._fds.pop(path, None)
+            if fd is not None:
+                self._release(path, fd)
+
+    def _release(self, path: str, fd: int):
+        """Sync (if dirty) and close a descriptor already removed from _fds."""
+        if fd in self._dirty:
+            self._dirty.discard(fd)
+            try:
+                _fdatasync(fd)
+            except OSError:
+                pass
+        os.close(fd)
 
 
 class SubchatIsolationManager:
@@ -23,7 +146,7 @@ class SubchatIsolationManager:
       - All violations raise explicit errors
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, flush_interval_ms: int = 50):
         self.base_path = base_path.replace("\\", "/")
 
         self.captains_log_path = f"{self.base_path}/captains_log"
@@ -31,6 +154,12 @@ class SubchatIsolationManager:
 
         self.protected_prefix = "CL_"  # any folder starting with this is INVISIBLE
 
+        # Transcripts are append-only NDJSON (one record per message) with
+        # batched fdatasync; chat.json holds the compacted history.
+        self._writer = _GroupCommitWriter(flush_interval_ms)
+        # Folders already created by write_subchat (skips makedirs per append)
+        self._ensured_dirs: set = set()
+
     # -------------------------------------------------------------
     # INTERNAL UTILITIES
     # -------------------------------------------------------------
@@ -40,11 +169,109 @@ class SubchatIsolationManager:
         return folder.startswith(self.protected_prefix)
 
     def _full_path(self, folder: str) -> str:
-        return f"{self.subchat_root}/{folder}"
+        return _subchat_path(self.subchat_root, folder)
 
     def _exists(self, folder: str) -> bool:
         return os.path.isdir(self._full_path(folder))
 
+    def _check_read(self, requester: str, folder: str, approved: bool):
+        if self._is_protected(folder):
+            raise PermissionError("Access denied: Captain’s Log subchats are invisible.")
+
+        if not approved:
+            # Without approval, cross-subchat reads are forbidden
+            if requester != folder:
+                raise PermissionError(
+                    f"Requester '{requester}' cannot access subchat '{folder}' "
+                    "without explicit owner approval."
+                )
+
+    @staticmethod
+    def _iter_compacted(path: str) -> Iterator[Dict[str, Any]]:
+        """Records of a compacted chat.json (a JSON list, or legacy raw text)."""
+        if not os.path.isfile(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        try:
+            records = json.loads(raw)
+        except ValueError:
+            records = None
+        if isinstance(records, list):
+            for item in records:
+                record = _legacy_record(item)
+                if record is not None:
+                    yield record
+        elif raw:
+            # Legacy layout: chat.json held the raw transcript text.
+            yield {"content": raw}
+
+    @staticmethod
+    def _iter_log(path: str) -> Iterator[Dict[str, Any]]:
+        """Records of an NDJSON transcript log."""
+        if not os.path.isfile(path):
+            return
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn final line from a crash before fdatasync
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+    def _iter_records(self, folder: str) -> Iterator[Dict[str, Any]]:
+        """Compacted records from chat.json followed by the NDJSON tail."""
+        base = self._full_path(folder)
+        if os.path.exists(f"{base}/chat.ndjson.compacting") or os.path.exists(f"{base}/chat.ndjson.folded"):
+            # a compaction is running or was interrupted; wait for / finish it
+            with _COMPACT_LOCK:
+                self._recover_compaction(base)
+        yield from self._iter_compacted(f"{base}/chat.json")
+        yield from self._iter_log(f"{base}/chat.ndjson")
+
+    def _fold_pending(self, base: str) -> int:
+        """
+        Fold chat.json + chat.ndjson.compacting into a new chat.json.
+
+        Each step is one atomic rename, so a crash leaves a state that
+        _recover_compaction can tell apart: while the log is named
+        ".compacting" it has NOT been folded in; once renamed to ".folded"
+        the complete new transcript is in chat.json.tmp or chat.json.
+        Caller holds _COMPACT_LOCK.
+        """
+        pending = f"{base}/chat.ndjson.compacting"
+        folded = f"{base}/chat.ndjson.folded"
+        tmp = f"{base}/chat.json.tmp"
+        records = list(self._iter_compacted(f"{base}/chat.json"))
+        records.extend(self._iter_log(pending))
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pending, folded)
+        os.replace(tmp, f"{base}/chat.json")
+        os.remove(folded)
+        return len(records)
+
+    def _recover_compaction(self, base: str):
+        """Finish or redo a compaction interrupted by a crash. Caller holds _COMPACT_LOCK."""
+        folded = f"{base}/chat.ndjson.folded"
+        tmp = f"{base}/chat.json.tmp"
+        if os.path.exists(folded):
+            # the log is already in the (complete) new transcript
+            if os.path.exists(tmp):
+                os.replace(tmp, f"{base}/chat.json")
+            os.remove(folded)
+        elif os.path.exists(f"{base}/chat.ndjson.compacting"):
+            # crashed before the new transcript was complete: start over
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            self._fold_pending(base)
+
     # -------------------------------------------------------------
     # PUBLIC API
     # -------------------------------------------------------------
@@ -78,23 +305,16 @@ class SubchatIsolationManager:
 
         Otherwise raises an error.
         """
-        if self._is_protected(folder):
-            raise PermissionError("Access denied: Captain’s Log subchats are invisible.")
-
-        if not approved:
-            # Without approval, cross-subchat reads are forbidden
-            if requester != folder:
-                raise PermissionError(
-                    f"Requester '{requester}' cannot access subchat '{folder}' "
-                    "without explicit owner approval."
-                )
+        self._check_read(requester, folder, approved)
+        return "\n".join(str(r.get("content", "")) for r in self._iter_records(folder))
 
-        full_file = f"{self._full_path(folder)}/chat.json"
-        if not os.path.isfile(full_file):
-            return ""
-
-        with open(full_file, "r", encoding="utf-8") as f:
-            return f.read()
+    def iter_subchat(self, requester: str, folder: str, approved: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Streams transcript records ({"ts", "requester", "content"}) one at a
+        time, under the same access rules as read_subchat.
+        """
+        self._check_read(requester, folder, approved)
+        return self._iter_records(folder)
 
     def write_subchat(self, requester: str, folder: str, content: str, approved: bool = False):
         """
@@ -102,6 +322,8 @@ class SubchatIsolationManager:
             - requester == folder owner OR
             - explicit owner approval provided
         Captain’s Log subchats can ONLY be written by the Captains Log Manager.
+
+        Each call appends one record to chat.ndjson; history is never rewritten.
         """
         if self._is_protected(folder):
             raise PermissionError("Write denied: Captain’s Log subchats require CL manager.")
@@ -111,11 +333,47 @@ class SubchatIsolationManager:
                 f"Requester '{requester}' cannot write to subchat '{folder}' without approval."
             )
 
-        os.makedirs(self._full_path(folder), exist_ok=True)
-        full_file = f"{self._full_path(folder)}/chat.json"
-
-        with open(full_file, "w", encoding="utf-8") as f:
-            f.write(content)
+        full_path = self._full_path(folder)
+        if full_path not in self._ensured_dirs:
+            os.makedirs(full_path, exist_ok=True)
+            self._ensured_dirs.add(full_path)
+        record = {"ts": int(time.time()), "requester": requester, "content": content}
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        try:
+            self._writer.append(f"{full_path}/chat.ndjson", line)
+        except FileNotFoundError:
+            # folder deleted through another manager since we created it
+            os.makedirs(full_path, exist_ok=True)
+            self._writer.append(f"{full_path}/chat.ndjson", line)
+
+    def flush(self):
+        """Force a group commit of all pending transcript appends."""
+        self._writer.flush()
+
+    def compact_subchat(self, folder: str) -> int:
+        """
+        Folds chat.ndjson into chat.json (a JSON list of records) and truncates
+        the log. Intended to be called periodically by maintenance tasks.
+        Returns the number of records in the compacted transcript.
+        """
+        if self._is_protected(folder):
+            raise PermissionError("Compaction denied: Captain’s Log subchats are protected.")
+
+        base = self._full_path(folder)
+        log_file = f"{base}/chat.ndjson"
+        if not os.path.isfile(log_file):
+            return 0
+
+        with _COMPACT_LOCK:
+            self._recover_compaction(base)
+            if not os.path.isfile(log_file):
+                return 0
+            # Move the log aside; appends from here on start a fresh chat.ndjson.
+            # Closing every cached fd guarantees nothing more lands in the
+            # moved file once it is read.
+            os.replace(log_file, f"{base}/chat.ndjson.compacting")
+            _close_everywhere(log_file)
+            return self._fold_pending(base)
 
     def request_access(self, requester: str, target: str) -> Dict[str, str]:
         """
@@ -151,13 +409,13 @@ class SubchatIsolationManager:
             )
 
         full_path = self._full_path(folder)
-        if os.path.isdir(full_path):
-            for file in os.listdir(full_path):
-                try:
-                    os.remove(f"{full_path}/{file}")
-                except:
-                    pass
-            os.rmdir(full_path)
+        log_file = f"{full_path}/chat.ndjson"
+        self._ensured_dirs.discard(full_path)
+        with _COMPACT_LOCK:
+            _close_everywhere(log_file)
+            shutil.rmtree(full_path, ignore_errors=True)
+            # drop any fd another manager opened while the tree was removed
+            _close_everywhere(log_file)
 
 
 # ----------------------------------------------------------------------
@@ -6,50 +6,110 @@ Keeps everything local-only and works with security + recovery helpers.
 """
 from __future__ import annotations
 
-import json
+import mmap
+import os
+import shutil
 import uuid
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
+from core._json import dumps as _dumps, loads as _loads
 from core.subchat_security import SubchatSecurity
 from core.subchat_state import SubchatStateManager
 
 
+def _read_json(path: Path) -> Any:
+    """Parse a JSON file through a read-only mmap (no full-file bytes copy with orjson)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return _loads(view)
+
+
+_READ_ACL_CACHE_SIZE = 8192
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write a fully built buffer with a raw fd: open, one write, close."""
+    fd = os.open(str(path), _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write to a sibling temp file, then rename over `path` so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    _write_file(tmp, data)
+    os.replace(tmp, path)
+
+
 class _DefaultStorage:
-    """Minimal filesystem storage for subchat payloads."""
+    """
+    Minimal filesystem storage for subchat payloads.
+
+    Each subchat is one `<id>/subchat.json` holding {"metadata": ..., "data": ...};
+    the older metadata.json + data.json pair is migrated on first load.
+    """
 
     def __init__(self, base_dir: Optional[Path] = None):
         self.base_dir = Path(base_dir) if base_dir else Path(__file__).resolve().parents[1] / "sub_chats"
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
     def list_ids(self) -> List[str]:
-        return [p.name for p in self.base_dir.iterdir() if p.is_dir()]
+        # DirEntry.is_dir() uses the type from readdir, so no stat per entry
+        with os.scandir(self.base_dir) as it:
+            return [e.name for e in it if e.is_dir()]
 
     def create(self, subchat_id: str, metadata: Dict[str, Any]) -> None:
         sc_dir = self.base_dir / subchat_id
         sc_dir.mkdir(parents=True, exist_ok=True)
-        (sc_dir / "metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
-        (sc_dir / "data.json").write_text(json.dumps({"id": subchat_id, "messages": []}, indent=2), encoding="utf-8")
+        blob = {"metadata": metadata, "data": {"id": subchat_id, "messages": []}}
+        _replace_file(sc_dir / "subchat.json", _dumps(blob))
 
     def load(self, subchat_id: str) -> Optional[Dict[str, Any]]:
         sc_dir = self.base_dir / subchat_id
-        data_path = sc_dir / "data.json"
-        meta_path = sc_dir / "metadata.json"
         if not sc_dir.exists():
             return None
+        blob_path = sc_dir / "subchat.json"
+        if blob_path.exists():
+            blob = _read_json(blob_path)
+        else:
+            blob = self._migrate_legacy(sc_dir)
         payload: Dict[str, Any] = {"id": subchat_id}
+        if "metadata" in blob:
+            payload["metadata"] = blob["metadata"]
+        payload.update(blob.get("data") or {})
+        return payload
+
+    @staticmethod
+    def _migrate_legacy(sc_dir: Path) -> Dict[str, Any]:
+        """Fold the old metadata.json + data.json pair into subchat.json."""
+        meta_path = sc_dir / "metadata.json"
+        data_path = sc_dir / "data.json"
+        blob: Dict[str, Any] = {}
         if meta_path.exists():
-            payload["metadata"] = json.loads(meta_path.read_text(encoding="utf-8"))
+            blob["metadata"] = _read_json(meta_path)
         if data_path.exists():
-            payload.update(json.loads(data_path.read_text(encoding="utf-8")))
-        return payload
+            blob["data"] = _read_json(data_path)
+        if blob:
+            _replace_file(sc_dir / "subchat.json", _dumps(blob))
+            for legacy in (meta_path, data_path):
+                try:
+                    legacy.unlink()
+                except FileNotFoundError:
+                    pass
+        return blob
 
     def delete(self, subchat_id: str) -> None:
-        sc_dir = self.base_dir / subchat_id
-        if sc_dir.exists():
-            for item in sc_dir.iterdir():
-                item.unlink(missing_ok=True)
-            sc_dir.rmdir()
+        shutil.rmtree(self.base_dir / subchat_id, ignore_errors=True)
 
 
 class SubchatRecoveryManager:
@@ -63,15 +123,20 @@ class SubchatRecoveryManager:
         return self.recovery_root / f"{subchat_id}_recovery.json"
 
     def save_recovery_state(self, subchat_id: str, state_dict: Dict[str, Any]) -> None:
-        path = self.get_recovery_file(subchat_id)
-        path.write_text(json.dumps(state_dict, indent=2), encoding="utf-8")
+        _write_file(self.get_recovery_file(subchat_id), _dumps(state_dict))
+
+    def save_recovery_states(self, states: Dict[str, Dict[str, Any]]) -> None:
+        """Batch variant: serialize every snapshot first, then write them back-to-back."""
+        buffers = [(self.get_recovery_file(sid), _dumps(state)) for sid, state in states.items()]
+        for path, data in buffers:
+            _write_file(path, data)
 
     def load_recovery_state(self, subchat_id: str) -> Optional[Dict[str, Any]]:
         path = self.get_recovery_file(subchat_id)
         if not path.exists():
             return None
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
+            return _loads(path.read_bytes())
         except Exception:
             return None
 
@@ -98,6 +163,9 @@ class SubchatLoader:
         self.state_manager = state_manager if state_manager is not None else SubchatStateManager()
         self.recovery = recovery if recovery is not None else SubchatRecoveryManager()
         self.logger = logger
+        # (subchat_id, requester) -> can_read result, valid for one security.acl_version
+        self._read_acl: Dict[tuple, bool] = {}
+        self._read_acl_version: Optional[int] = None
 
     def _log(self, msg: str):
         if self.logger:
@@ -106,6 +174,30 @@ class SubchatLoader:
             except Exception:
                 pass
 
+    def _can_read(self, subchat_id: str, requester: str) -> bool:
+        """
+        security.can_read with the decision memoized until the ACL changes.
+        Repeat reads by the same requester skip the metadata walk but are
+        still audited.
+        """
+        version = getattr(self.security, "acl_version", None)
+        if version is None:
+            # custom security backend without versioning: no caching
+            return self.security.can_read(subchat_id, requester)
+        if version != self._read_acl_version:
+            self._read_acl.clear()
+            self._read_acl_version = version
+        key = (subchat_id, requester)
+        allowed = self._read_acl.get(key)
+        if allowed is None:
+            allowed = self.security.can_read(subchat_id, requester)
+            if len(self._read_acl) >= _READ_ACL_CACHE_SIZE:
+                self._read_acl.clear()
+            self._read_acl[key] = allowed
+        else:
+            self.security.audit_access(subchat_id, requester, "read", allowed)
+        return allowed
+
     def list_ids(self) -> List[str]:
         ids = set(self.storage.list_ids()) if hasattr(self.storage, "list_ids") else set()
         ids.update(self.security.list_subchats())
@@ -113,7 +205,7 @@ class SubchatLoader:
 
     def load_subchat(self, subchat_id: str, requester: Optional[str] = None) -> Dict[str, Any]:
         meta = self.security.get_subchat_info(subchat_id)
-        if requester and not self.security.can_read(subchat_id, requester):
+        if requester and not self._can_read(subchat_id, requester):
             raise PermissionError("Requester not allowed to read subchat")
 
         # Prefer recovery snapshot
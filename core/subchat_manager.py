@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import logging
+import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -19,34 +20,67 @@ class SubchatManager:
         self.system_root = Path(system_root)
         self.subchat_root = self.system_root / "subchats"
 
+        # Discovery cache: id -> descriptor, valid while the directory mtime
+        # is unchanged (adding/removing a subchat folder bumps it).
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._dir_mtime_ns: int = -1
+
+    def _refresh_index(self) -> Dict[str, Dict[str, str]]:
+        """
+        Rescan the subchats directory if its mtime changed; return the index.
+        """
+        try:
+            mtime_ns = os.stat(self.subchat_root).st_mtime_ns
+        except OSError:
+            self._index, self._dir_mtime_ns = {}, -1
+            return self._index
+
+        if mtime_ns != self._dir_mtime_ns:
+            index: Dict[str, Dict[str, str]] = {}
+            try:
+                with os.scandir(self.subchat_root) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            index[entry.name] = {"id": entry.name, "path": entry.path}
+            except OSError as exc:
+                logger.warning("Subchat discovery failed: %s", exc)
+                return {}
+            self._index = dict(sorted(index.items()))
+            self._dir_mtime_ns = mtime_ns
+
+        return self._index
+
     def _discover_subchats(self) -> List[Dict[str, str]]:
         """
         Best-effort discovery of subchat descriptors.
 
         For now, returns an empty list if the directory is missing or unreadable.
         """
-        if not self.subchat_root.exists():
-            return []
+        return [dict(d) for d in self._refresh_index().values()]
 
-        subchats: List[Dict[str, str]] = []
-        try:
-            for path in sorted(self.subchat_root.iterdir()):
-                if path.is_dir():
-                    subchats.append({"id": path.name, "path": str(path)})
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Subchat discovery failed: %s", exc)
-            return []
-        return subchats
+    def get_subchat(self, subchat_id: str) -> Optional[Dict[str, str]]:
+        """
+        Return the descriptor for one subchat, or None if it does not exist.
+        """
+        # Folders are named by id, so resolve the folder directly: one stat,
+        # no directory scan (and no list copy) even when the cache is stale.
+        if not subchat_id or subchat_id in (".", "..") or "/" in subchat_id or os.sep in subchat_id:
+            return None
+        path = self.subchat_root / subchat_id
+        if not path.is_dir():
+            return None
+        return {"id": subchat_id, "path": str(path)}
 
     def status(self) -> Dict[str, object]:
         """
         Lightweight status block used by bootup diagnostics.
         """
-        subchats = self._discover_subchats()
+        # Only the count is needed, so skip copying descriptors.
+        count = len(self._refresh_index())
         return {
             "status": "ok",
-            "configured": bool(subchats),
-            "count": len(subchats),
+            "configured": bool(count),
+            "count": count,
         }
 
     def list_subchats(self) -> List[Dict[str, str]]:
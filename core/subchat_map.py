@@ -39,16 +39,20 @@ class SubchatMap:
     def validate_topology(self):
         """Ensures subchat topology is logically consistent."""
         issues = []
+        known = self.components.keys()
 
+        # Set difference does the membership checks in C; the per-item loop
+        # only runs for components that actually have problems (and keeps
+        # the issues in declaration order).
         for comp, deps in self.dependencies.items():
-            for dep in deps:
-                if dep not in self.components:
-                    issues.append(f"Missing dependency: {comp} depends on {dep}")
+            missing = set(deps) - known
+            if missing:
+                issues.extend(f"Missing dependency: {comp} depends on {dep}" for dep in deps if dep in missing)
 
         for comp, next_steps in self.transitions.items():
-            for step in next_steps:
-                if step not in self.components:
-                    issues.append(f"Invalid transition: {comp} → {step}")
+            invalid = set(next_steps) - known
+            if invalid:
+                issues.extend(f"Invalid transition: {comp} → {step}" for step in next_steps if step in invalid)
 
         return issues
 
@@ -3,26 +3,65 @@ SubChat Memory Engine
 Location: /core/subchat_memory.py
 
 Simple, local, JSON-backed memory store for SubChats.
-Each SubChat gets its own memory file under core/subchat_memories/<subchat_id>.json
+Each SubChat gets its own append-only memory log under
+core/subchat_memories/<subchat_id>.jsonl (one JSON record per line; updates and
+deletes are appended and folded in by periodic compaction).
 
 Features:
 - Add / update / delete memory entries
 - Time-stamped entries with uuid ids
-- Retrieve recent entries, query by keyword (simple substring)
-- Export / import for backups
+- Retrieve recent entries, query by keyword (simple substring) or any of several keywords
+- Export / import for backups (imports stream through ijson when installed)
 - Size limits (max_entries) to prevent uncontrolled growth
 - Basic thread-safe file operations (OS-level atomic replace)
 - Safe default paths inside core/subchat_memories
+- get_memory(): shared, LRU-bounded instances so callers don't re-read the log
 """
 
 from __future__ import annotations
 import os
-import json
+import mmap
+import re
 import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+from core._json import dumps as _dumps, loads as _loads
+from core._persist import synchronized as _synchronized
+
+try:
+    import zstandard  # type: ignore
+except Exception:
+    zstandard = None
+
+try:
+    import ijson  # type: ignore
+except Exception:
+    ijson = None
+
+try:
+    import ahocorasick  # type: ignore  # pyahocorasick
+except Exception:
+    ahocorasick = None
+
+# Zstandard frame magic number (28 B5 2F FD), used to detect compressed imports
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Log records carrying this key are operations, not entries. Entries never
+# have it (see _normalize_entries), so user data can't be mistaken for one.
+_OP_KEY = "__op__"
+_OP_DELETE = "delete"
+
+# Compaction buffers above this size are dropped after a save, not kept
+_WRITE_BUF_SOFT_CAP = 128 * 1024
+
+# Linux-only flag for unnamed temp files (None elsewhere)
+_O_TMPFILE = getattr(os, "O_TMPFILE", None) if os.path.isdir("/proc/self/fd") else None
 
 # Location for storing subchat memory files (core/subchat_memories)
 CORE_DIR = Path(__file__).resolve().parent
@@ -30,8 +69,97 @@ MEMORY_DIR = CORE_DIR / "subchat_memories"
 MEMORY_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _load_mapped(path: Path) -> Any:
+    """
+    Parse a whole JSON document (plain or zstd-compressed) from a read-only
+    mmap of the file. orjson parses straight from the mapping, so large
+    files are paged in on demand and never copied into a bytes object first.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:4] == _ZSTD_MAGIC:
+                if zstandard is None:
+                    raise RuntimeError("zstandard_not_installed")
+                return _loads(zstandard.ZstdDecompressor().decompress(mm, max_output_size=1 << 31))
+            with memoryview(mm) as view:
+                return _loads(view)
+
+
+def _open_json_stream(f):
+    """Binary stream over a plain or zstd-compressed JSON file."""
+    if f.read(4) == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("zstandard_not_installed")
+        f.seek(0)
+        return zstandard.ZstdDecompressor().stream_reader(f)
+    f.seek(0)
+    return f
+
+
+def _stream_list_tail(path: Path, maxlen: Optional[int]) -> Optional[Tuple[int, List[Any]]]:
+    """
+    Incrementally parse a top-level JSON list with ijson, keeping only the
+    last `maxlen` items. Returns (items seen, kept items), or None if the
+    document is not a list. Peak memory is one item plus the kept tail.
+    """
+    with open(path, "rb") as f:
+        stream = _open_json_stream(f)
+        # ijson.items(..., "item") silently yields nothing for a non-list, so
+        # check the top-level type from the parser's first event
+        events = ijson.parse(stream)
+        first = next(events, None)
+        if first is None or first[1] != "start_array":
+            return None
+    with open(path, "rb") as f:
+        tail: deque = deque(maxlen=maxlen)
+        count = 0
+        # use_float: ijson defaults to Decimal, which the log writer cannot encode
+        for item in ijson.items(_open_json_stream(f), "item", use_float=True):
+            tail.append(item)
+            count += 1
+    return count, list(tail)
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """One compact JSON record terminated by a newline (JSONL)."""
+    return _dumps(obj, newline=True)
+
+
+def _normalize_entries(data: List[Any], taken_ids: Optional[set] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Validate entries entering from outside (imports, legacy files) before any
+    state is touched. Returns None if any item is not a dict. Entries without
+    an id, or whose id is already taken, get a fresh uuid so the log's
+    upsert-by-id replay keeps every one of them; a stray op key is dropped.
+    """
+    if not all(isinstance(e, dict) for e in data):
+        return None
+    seen = set(taken_ids) if taken_ids else set()
+    out: List[Dict[str, Any]] = []
+    for e in data:
+        eid = e.get("id")
+        if eid is None or eid in seen or _OP_KEY in e:
+            e = {k: v for k, v in e.items() if k != _OP_KEY}
+            if eid is None or eid in seen:
+                eid = e["id"] = str(uuid.uuid4())
+        seen.add(eid)
+        out.append(e)
+    return out
+
+
+_iso_cache: Tuple[int, str] = (-1, "")
+
+
 def _now_iso() -> str:
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    """UTC "YYYY-MM-DDTHH:MM:SSZ"; formatted at most once per wall-clock second."""
+    global _iso_cache
+    sec = time.time_ns() // 1_000_000_000
+    cached = _iso_cache
+    if cached[0] != sec:
+        cached = _iso_cache = (sec, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(sec)))
+    return cached[1]
 
 
 class SubChatMemory:
@@ -49,37 +177,149 @@ class SubChatMemory:
     def __init__(self, subchat_id: str, max_entries: int = 1000):
         self.subchat_id = str(subchat_id)
         self.max_entries = int(max_entries)
-        self.file_path = MEMORY_DIR / f"{self.subchat_id}.json"
-        self._entries: List[Dict[str, Any]] = []
-        self._load()
+        self.file_path = MEMORY_DIR / f"{self.subchat_id}.jsonl"
+        # pre-JSONL layout: a single JSON list, migrated on first load
+        self.legacy_path = MEMORY_DIR / f"{self.subchat_id}.json"
+        # records in the log file; compaction runs once more than half are stale
+        self._log_records = 0
+        # serialization buffer reused across compactions (see _atomic_write)
+        self._write_buf = bytearray()
+        # Parsed lazily on first access, so instances that are created but
+        # never read (or only written to after a clear) skip the file parse.
+        self._loaded_entries: Optional[List[Dict[str, Any]]] = None
+        # Column kept in lockstep with _entries (same index) so query scans a
+        # flat list of strings instead of chasing one dict per entry.
+        self._contents: List[str] = []
+        self._contents_lc: List[str] = []  # lowercased once, for case-insensitive query
+        # id -> position (offset by _index_base, which advances as the oldest
+        # entries are trimmed). Deletes leave a None tombstone at that position;
+        # tombstones are swept on the next read of _entries.
+        self._id_index: Dict[str, int] = {}
+        self._index_base = 0
+        self._tombstones = 0
+        # Instances are shared across threads (get_memory); the entries and
+        # their columns/index change together, so every public method runs
+        # under this lock.
+        self._lock = threading.RLock()
+
+    @property
+    def _entries(self) -> List[Dict[str, Any]]:
+        if self._loaded_entries is None:
+            self._load()
+        elif self._tombstones:
+            self._sweep_tombstones()
+        return self._loaded_entries
+
+    @_entries.setter
+    def _entries(self, value: List[Dict[str, Any]]) -> None:
+        self._loaded_entries = value
+        self._rebuild_columns()
+
+    def _rebuild_columns(self) -> None:
+        self._contents = [str(e.get("content", "")) for e in self._loaded_entries]
+        self._contents_lc = [c.lower() for c in self._contents]
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self._id_index = {e.get("id"): i for i, e in enumerate(self._loaded_entries)}
+        self._index_base = 0
+        self._tombstones = 0
+
+    def _sweep_tombstones(self) -> None:
+        """Drop deleted slots from the entries and their columns in one pass."""
+        entries = self._loaded_entries
+        keep = [i for i, e in enumerate(entries) if e is not None]
+        self._loaded_entries = [entries[i] for i in keep]
+        self._contents = [self._contents[i] for i in keep]
+        self._contents_lc = [self._contents_lc[i] for i in keep]
+        self._rebuild_index()
 
     # -------------------------
     # Persistence
     # -------------------------
     def _load(self) -> None:
         if not self.file_path.exists():
+            self._load_legacy()
+            return
+        entries: Dict[str, Dict[str, Any]] = {}
+        records = 0
+        try:
+            with open(self.file_path, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        rec = _loads(line)
+                    except ValueError:
+                        # torn trailing line from an interrupted append
+                        continue
+                    records += 1
+                    if rec.get(_OP_KEY) == _OP_DELETE:
+                        entries.pop(rec.get("id"), None)
+                    else:
+                        # upsert: updates keep the entry's original position
+                        entries[rec.get("id")] = rec
+        except Exception:
+            # if anything goes wrong, do not crash the caller; start fresh
+            entries = {}
+        self._log_records = records
+        self._entries = list(entries.values())
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries = self._entries[-self.max_entries :]
+
+    def _load_legacy(self) -> None:
+        if not self.legacy_path.exists():
             self._entries = []
             return
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                obj = json.load(f)
-            if isinstance(obj, list):
-                self._entries = obj
-            else:
+            obj = _load_mapped(self.legacy_path)
+            if not isinstance(obj, list):
                 # backwards compatibility: some files might be dicts
-                self._entries = obj.get("entries", [])
+                obj = obj.get("entries", [])
+            # legacy entries may lack ids; skip anything that isn't an entry
+            self._entries = _normalize_entries([e for e in obj if isinstance(e, dict)])
         except Exception:
             # if anything goes wrong, do not crash the caller; start fresh
             self._entries = []
+            return
+        # migrate to the JSONL log
+        self._save()
+        if self.file_path.exists():
+            try:
+                self.legacy_path.unlink()
+            except Exception:
+                pass
 
-    def _atomic_write(self, data: Any) -> None:
+    def _atomic_write(self, data: List[Dict[str, Any]]) -> None:
         """
         Write file atomically to avoid corruption (write to temp then move).
         """
+        payload = self._write_buf
+        try:
+            payload.clear()
+        except BufferError:
+            # a view from a failed write is still alive; start a fresh buffer
+            payload = self._write_buf = bytearray()
+        for e in data:
+            payload += _dumps_line(e)
+        try:
+            self._write_payload(payload)
+        finally:
+            if len(payload) > _WRITE_BUF_SOFT_CAP:
+                self._write_buf = bytearray()
+
+    def _write_payload(self, payload: bytearray) -> None:
+        if _O_TMPFILE:
+            try:
+                self._atomic_write_tmpfile(payload)
+                return
+            except OSError:
+                # filesystem without O_TMPFILE support (or no /proc): fall back
+                pass
         tmp_fd, tmp_path = tempfile.mkstemp(prefix="mem_", dir=str(MEMORY_DIR))
         try:
-            with os.fdopen(tmp_fd, "w", encoding="utf-8") as tmpf:
-                json.dump(data, tmpf, ensure_ascii=False, indent=2)
+            with os.fdopen(tmp_fd, "wb") as tmpf:
+                tmpf.write(payload)
                 tmpf.flush()
                 os.fsync(tmpf.fileno())
             os.replace(tmp_path, str(self.file_path))
@@ -91,20 +331,64 @@ class SubChatMemory:
                 except Exception:
                     pass
 
+    def _atomic_write_tmpfile(self, payload: bytes) -> None:
+        """
+        Linux fast path: write into an unnamed O_TMPFILE inode, then give it a
+        name only once it is complete and synced. No mkstemp name retries and
+        nothing to clean up if the write fails (the inode just disappears).
+        """
+        fd = os.open(str(self.file_path.parent), _O_TMPFILE | os.O_WRONLY, 0o600)
+        tmp_path = f"{self.file_path}.tmp"
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+            try:
+                os.unlink(tmp_path)  # stale from a crash between link and replace
+            except FileNotFoundError:
+                pass
+            os.link(f"/proc/self/fd/{fd}", tmp_path)
+        finally:
+            os.close(fd)
+        # linkat() cannot overwrite, so publish over the old file with a rename
+        os.replace(tmp_path, str(self.file_path))
+
     def _save(self) -> None:
+        """Full rewrite (compaction) of the log from the in-memory entries."""
         # Enforce max_entries before saving
         if self.max_entries is not None and len(self._entries) > self.max_entries:
             # drop oldest entries
             self._entries = self._entries[-self.max_entries :]
         try:
             self._atomic_write(self._entries)
+            self._log_records = len(self._entries)
         except Exception:
             # best-effort save; ignore failures to avoid crashes
             pass
 
+    def _append(self, *records: Dict[str, Any]) -> None:
+        """
+        Append records to the log in one write: O(record) bytes instead of
+        rewriting every entry. Compacts once more than half the log records
+        are stale.
+        """
+        try:
+            with open(self.file_path, "ab") as f:
+                f.write(b"".join(_dumps_line(r) for r in records))
+            self._log_records += len(records)
+        except Exception:
+            # best-effort save; ignore failures to avoid crashes
+            return
+        # live count without sweeping tombstones (keeps back-to-back deletes O(1))
+        live = len(self._loaded_entries or ()) - self._tombstones
+        if self._log_records > 2 * max(live, 1):
+            self._save()
+
     # -------------------------
     # CRUD operations
     # -------------------------
+    @_synchronized
     def add_entry(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Add a new memory entry.
@@ -116,61 +400,91 @@ class SubChatMemory:
             "content": str(content),
             "metadata": metadata or {},
         }
-        self._entries.append(entry)
-        # enforce size limit immediately
-        if self.max_entries is not None and len(self._entries) > self.max_entries:
-            self._entries = self._entries[-self.max_entries :]
-        self._save()
+        entries = self._entries
+        entries.append(entry)
+        self._contents.append(entry["content"])
+        self._contents_lc.append(entry["content"].lower())
+        self._id_index[entry["id"]] = self._index_base + len(entries) - 1
+        # enforce size limit immediately; trimmed ids are logged as deletes so
+        # a reload (which only trims past max_entries) can't bring them back
+        trimmed: List[Dict[str, Any]] = []
+        if self.max_entries is not None and len(entries) > self.max_entries:
+            excess = len(entries) - self.max_entries
+            for i, old in enumerate(entries[:excess]):
+                if self._id_index.get(old.get("id")) == self._index_base + i:
+                    del self._id_index[old.get("id")]
+                trimmed.append({_OP_KEY: _OP_DELETE, "id": old.get("id")})
+            self._index_base += excess
+            del entries[:excess]
+            del self._contents[:excess]
+            del self._contents_lc[:excess]
+        self._append(entry, *trimmed)
         return entry
 
+    @_synchronized
     def update_entry(self, entry_id: str, content: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
         Update an existing entry by id. Returns True if updated.
         """
-        for e in self._entries:
-            if e.get("id") == entry_id:
-                if content is not None:
-                    e["content"] = str(content)
-                if metadata is not None:
-                    e["metadata"] = metadata
-                e["timestamp"] = _now_iso()
-                self._save()
-                return True
-        return False
+        entries = self._entries
+        pos = self._id_index.get(entry_id)
+        if pos is None:
+            return False
+        i = pos - self._index_base
+        e = entries[i]
+        if content is not None:
+            e["content"] = self._contents[i] = str(content)
+            self._contents_lc[i] = e["content"].lower()
+        if metadata is not None:
+            e["metadata"] = metadata
+        e["timestamp"] = _now_iso()
+        self._append(e)
+        return True
 
+    @_synchronized
     def delete_entry(self, entry_id: str) -> bool:
         """
         Delete an entry by id. Returns True if deleted.
         """
-        orig_len = len(self._entries)
-        self._entries = [e for e in self._entries if e.get("id") != entry_id]
-        if len(self._entries) != orig_len:
-            self._save()
-            return True
-        return False
+        if self._loaded_entries is None:
+            self._load()
+        pos = self._id_index.pop(entry_id, None)
+        if pos is None:
+            return False
+        # O(1): tombstone the slot instead of rebuilding the list
+        self._loaded_entries[pos - self._index_base] = None
+        self._tombstones += 1
+        self._append({_OP_KEY: _OP_DELETE, "id": entry_id})
+        return True
 
+    @_synchronized
     def clear(self) -> None:
         """Clear all memory entries for this subchat."""
         self._entries = []
-        try:
-            if self.file_path.exists():
-                self.file_path.unlink()
-        except Exception:
-            pass
+        self._log_records = 0
+        for path in (self.file_path, self.legacy_path):
+            try:
+                if path.exists():
+                    path.unlink()
+            except Exception:
+                pass
 
     # -------------------------
     # Retrieval / Query
     # -------------------------
+    @_synchronized
     def get_recent(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Return the most recent `limit` entries (newest first)."""
         if limit <= 0:
             return []
         return list(reversed(self._entries[-limit:]))
 
+    @_synchronized
     def list_all(self) -> List[Dict[str, Any]]:
         """Return all entries in insertion order (oldest first)."""
         return list(self._entries)
 
+    @_synchronized
     def query(self, keyword: str, limit: int = 10, case_sensitive: bool = False) -> List[Dict[str, Any]]:
         """
         Simple keyword query over content and metadata values.
@@ -179,17 +493,17 @@ class SubChatMemory:
         if not keyword:
             return []
         kw = keyword if case_sensitive else keyword.lower()
+        entries = self._entries
+        contents = self._contents if case_sensitive else self._contents_lc
         matches: List[Dict[str, Any]] = []
-        for e in reversed(self._entries):  # newest-first
-            hay = e.get("content", "")
-            hay_cmp = hay if case_sensitive else hay.lower()
-            if kw in hay_cmp:
-                matches.append(e)
+        for i in range(len(contents) - 1, -1, -1):  # newest-first
+            if kw in contents[i]:
+                matches.append(entries[i])
                 if len(matches) >= limit:
                     break
             else:
                 # check metadata values
-                meta = e.get("metadata", {})
+                meta = entries[i].get("metadata", {})
                 found = False
                 for v in meta.values():
                     try:
@@ -201,53 +515,118 @@ class SubChatMemory:
                     except Exception:
                         continue
                 if found:
-                    matches.append(e)
+                    matches.append(entries[i])
                     if len(matches) >= limit:
                         break
         return matches
 
+    @_synchronized
+    def query_many(self, keywords: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Case-insensitive query matching entries that contain ANY of `keywords`
+        (content or metadata values). Returns up to `limit` entries, newest-first.
+
+        Each entry is scanned once regardless of the number of keywords: an
+        Aho-Corasick automaton when pyahocorasick is installed, otherwise a
+        single compiled regex alternation.
+        """
+        kws = sorted({k.lower() for k in keywords if k}, key=len, reverse=True)
+        if not kws:
+            return []
+
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for k in kws:
+                automaton.add_word(k, k)
+            automaton.make_automaton()
+
+            def hit(text: str) -> bool:
+                return next(automaton.iter(text), None) is not None
+        else:
+            pattern = re.compile("|".join(map(re.escape, kws)))
+
+            def hit(text: str) -> bool:
+                return pattern.search(text) is not None
+
+        entries = self._entries
+        contents = self._contents_lc
+        matches: List[Dict[str, Any]] = []
+        for i in range(len(contents) - 1, -1, -1):  # newest-first
+            if hit(contents[i]) or any(
+                hit(str(v).lower()) for v in entries[i].get("metadata", {}).values()
+            ):
+                matches.append(entries[i])
+                if len(matches) >= limit:
+                    break
+        return matches
+
     # -------------------------
     # Export / Import / Info
     # -------------------------
-    def export_json(self, dest_path: Optional[str] = None) -> str:
+    @_synchronized
+    def export_json(self, dest_path: Optional[str] = None, pretty: bool = True) -> str:
         """
         Export memory to JSON file. If dest_path is None, creates a timestamped export in MEMORY_DIR.
+        A dest_path ending in ".zst" is written zstd-compressed (requires `zstandard`).
+        Exports are indented for reading by default; pass pretty=False for compact output.
         Returns path to exported file.
         """
         dest = Path(dest_path) if dest_path else MEMORY_DIR / f"{self.subchat_id}_export_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
         try:
-            with open(dest, "w", encoding="utf-8") as f:
-                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            payload = _dumps(self._entries, pretty=pretty)
+            if dest.suffix == ".zst":
+                if zstandard is None:
+                    raise RuntimeError("zstandard is not installed")
+                payload = zstandard.ZstdCompressor(level=3, threads=-1).compress(payload)
+            with open(dest, "wb") as f:
+                f.write(payload)
             return str(dest)
         except Exception as e:
             raise RuntimeError(f"Export failed: {e}")
 
+    @_synchronized
     def import_json(self, src_path: str, merge: bool = True) -> Dict[str, Any]:
         """
-        Import entries from a JSON file. If merge is False, existing entries are replaced.
+        Import entries from a JSON file (plain or zstd-compressed). If merge is
+        False, existing entries are replaced.
+        With ijson installed the file is streamed and only the newest
+        max_entries items are ever held in memory.
         Returns summary dict.
         """
         src = Path(src_path)
         if not src.exists():
             return {"status": "error", "message": "source_not_found"}
         try:
-            with open(src, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, list):
+            if ijson is not None:
+                streamed = _stream_list_tail(src, self.max_entries)
+                if streamed is None:
+                    return {"status": "error", "message": "invalid_format"}
+                imported, data = streamed
+            else:
+                data = _load_mapped(src)
+                if not isinstance(data, list):
+                    return {"status": "error", "message": "invalid_format"}
+                imported = len(data)
+            # validate everything before touching in-memory state
+            taken = {e.get("id") for e in self._entries} if merge else None
+            data = _normalize_entries(data, taken)
+            if data is None:
                 return {"status": "error", "message": "invalid_format"}
             if merge:
-                # naive merge: append new entries (no dedupe)
+                # naive merge: append new entries (no dedupe; colliding ids are re-keyed)
                 self._entries.extend(data)
+                self._rebuild_columns()
             else:
                 self._entries = data
             # enforce max entries
             if self.max_entries is not None and len(self._entries) > self.max_entries:
                 self._entries = self._entries[-self.max_entries :]
             self._save()
-            return {"status": "ok", "imported": len(data)}
+            return {"status": "ok", "imported": imported}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    @_synchronized
     def info(self) -> Dict[str, Any]:
         """Return basic info about this subchat memory."""
         return {
@@ -256,4 +635,35 @@ class SubChatMemory:
             "entries": len(self._entries),
             "max_entries": self.max_entries,
             "last_timestamp": self._entries[-1]["timestamp"] if self._entries else None,
-        }
\ No newline at end of file
+        }
+
+
+# -------------------------
+# Shared instances
+# -------------------------
+_MEMORY_CACHE_SIZE = 64
+_MEMORY_CACHE: "OrderedDict[str, SubChatMemory]" = OrderedDict()
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def get_memory(subchat_id: str, max_entries: int = 1000) -> SubChatMemory:
+    """
+    Return the shared SubChatMemory for `subchat_id`, creating it on first use.
+
+    Short-lived callers (request handlers) reuse an already-loaded instance
+    instead of re-parsing the log each time. At most _MEMORY_CACHE_SIZE
+    instances are kept; evicting one loses nothing because every mutation
+    is written to disk as it happens. `max_entries` only applies when the
+    instance is created; later calls share the existing instance's limit.
+    """
+    key = str(subchat_id)
+    with _MEMORY_CACHE_LOCK:
+        mem = _MEMORY_CACHE.get(key)
+        if mem is None:
+            mem = SubChatMemory(key, max_entries)
+            _MEMORY_CACHE[key] = mem
+            if len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+                _MEMORY_CACHE.popitem(last=False)
+        else:
+            _MEMORY_CACHE.move_to_end(key)
+        return mem
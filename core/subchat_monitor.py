@@ -1,20 +1,29 @@
 """
 Subchat Monitor for PRIMUS
 Tracks health, heartbeats, activity, timeouts and recovery for subchats.
-Persists state to disk so monitor survives restarts.
+Persists state to disk (snapshot + append-only delta log) so monitor survives restarts.
 
 Location: C:\P.R.I.M.U.S OS\System\core\subchat_monitor.py
 """
 
 from __future__ import annotations
 
-import json
+import itertools
 import logging
+import os
 import threading
 import time
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional
+
+from core._json import dumps as _dumps, loads as _loads
+
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None
+
 
 # Logger setup (safe: won't duplicate handlers)
 logger = logging.getLogger("core.subchat_monitor")
@@ -28,18 +37,74 @@ logger.setLevel(logging.INFO)
 CORE_DIR = Path(__file__).resolve().parent
 STATE_FILE = CORE_DIR / "subchat_monitor_state.json"
 
+_LOG_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+_SHARD_COUNT = 16  # power of two, so hash & mask picks the stripe
+_SHARD_MASK = _SHARD_COUNT - 1
+
+# Registries at least this large get their timeout scan vectorized (numpy).
+_VECTORIZE_MIN = 256
+_STATE_CODES = {"healthy": 0, "degraded": 1}  # other states never time out
+
+
+def _mono_to_wall(mono_ns: int) -> float:
+    """Wall-clock seconds for a monotonic_ns reading (for persistence/operators)."""
+    return (mono_ns + time.time_ns() - time.monotonic_ns()) / 1e9
+
+
+def _wall_to_mono(wall: float) -> int:
+    """monotonic_ns equivalent of a persisted wall-clock timestamp."""
+    return time.monotonic_ns() - (time.time_ns() - int(wall * 1e9))
+
 
 @dataclass
 class SubchatStatus:
     id: str
     name: Optional[str] = None
-    last_heartbeat: float = field(default_factory=lambda: time.time())
+    # monotonic clock: immune to wall-clock jumps, compared as integers
+    last_heartbeat_ns: int = field(default_factory=time.monotonic_ns)
     created_at: float = field(default_factory=lambda: time.time())
     state: str = "healthy"  # healthy | degraded | offline | recovering
     metadata: Dict = field(default_factory=dict)
 
+    @property
+    def last_heartbeat(self) -> float:
+        """Wall-clock time of the last heartbeat."""
+        return _mono_to_wall(self.last_heartbeat_ns)
+
     def to_dict(self):
-        return asdict(self)
+        # persisted as wall-clock seconds, same shape as before
+        return {
+            "id": self.id,
+            "name": self.name,
+            "last_heartbeat": self.last_heartbeat,
+            "created_at": self.created_at,
+            "state": self.state,
+            "metadata": dict(self.metadata),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, sid: Optional[str] = None) -> "SubchatStatus":
+        wall = data.get("last_heartbeat")
+        return cls(
+            id=data.get("id", sid),
+            name=data.get("name"),
+            last_heartbeat_ns=time.monotonic_ns() if wall is None else _wall_to_mono(float(wall)),
+            created_at=float(data.get("created_at", time.time())),
+            state=data.get("state", "healthy"),
+            metadata=data.get("metadata", {}),
+        )
+
+
+class _Shard:
+    """One stripe of the registry: its own lock, statuses and log descriptor."""
+
+    __slots__ = ("lock", "statuses", "log_fd")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statuses: Dict[str, SubchatStatus] = {}
+        self.log_fd: Optional[int] = None
 
 
 class SubchatMonitor:
@@ -62,16 +127,39 @@ class SubchatMonitor:
         state_path: Optional[Path] = None,
         on_timeout: Optional[Callable[[SubchatStatus], None]] = None,
         on_recover: Optional[Callable[[SubchatStatus], None]] = None,
+        save_debounce: float = 0.5,
     ):
         self.timeout_seconds = int(timeout_seconds)
+        self._timeout_ns = self.timeout_seconds * 1_000_000_000
         self.monitor_interval = float(monitor_interval)
         self.state_path = Path(state_path) if state_path else STATE_FILE
-
-        self._lock = threading.RLock()
+        self.save_debounce = float(save_debounce)
+
+        # Statuses are striped across _SHARD_COUNT shards by hash(sid), each
+        # with its own lock, so heartbeats for different subchats don't
+        # contend. The global _lock only covers membership publication,
+        # snapshots and lifecycle. Lock order: shard(s) by index, then _lock.
+        self._shards: List[_Shard] = [_Shard() for _ in range(_SHARD_COUNT)]
+        self._lock = threading.Lock()
         self._running = False
         self._thread: Optional[threading.Thread] = None
-
-        self.registry: Dict[str, SubchatStatus] = {}
+        # set by stop(); the loop waits on it so shutdown doesn't sit out a full interval
+        self._stop_event = threading.Event()
+
+        # Mutations append one JSON line to the delta log next to the state
+        # file (O(1) per heartbeat). Once the log grows past the snapshot
+        # threshold, the writer thread folds it into a full snapshot,
+        # debounced to at most one per save_debounce seconds.
+        self.log_path = self.state_path.with_suffix(".log")
+        self._log_seq = itertools.count()  # next() is atomic: safe across shards
+        self._log_base = 0
+        self._dirty = threading.Event()
+        self._writer_thread: Optional[threading.Thread] = None
+
+        # Copy-on-write view of all statuses for lock-free readers. It is
+        # republished (one attribute store) whenever membership changes and
+        # never mutated after publication.
+        self._snapshot: Dict[str, SubchatStatus] = {}
 
         # callbacks
         self.on_timeout = on_timeout
@@ -80,116 +168,284 @@ class SubchatMonitor:
         # attempt to load persistent state
         self._load_state()
 
+    @property
+    def registry(self) -> Dict[str, SubchatStatus]:
+        """Read-only view of every registered subchat (the current snapshot)."""
+        return self._snapshot
+
+    def _shard(self, sid: str) -> _Shard:
+        return self._shards[hash(sid) & _SHARD_MASK]
+
     # ------------------------
     # Persistence
     # ------------------------
     def _load_state(self):
+        loaded: Dict[str, SubchatStatus] = {}
         try:
             if self.state_path.exists():
-                with open(self.state_path, "r", encoding="utf-8") as f:
-                    obj = json.load(f)
-                loaded = {}
+                with open(self.state_path, "rb") as f:
+                    obj = _loads(f.read())
                 for sid, data in obj.items():
-                    status = SubchatStatus(
-                        id=data.get("id", sid),
-                        name=data.get("name"),
-                        last_heartbeat=float(data.get("last_heartbeat", time.time())),
-                        created_at=float(data.get("created_at", time.time())),
-                        state=data.get("state", "healthy"),
-                        metadata=data.get("metadata", {}),
-                    )
-                    loaded[sid] = status
-                with self._lock:
-                    self.registry = loaded
+                    loaded[sid] = SubchatStatus.from_dict(data, sid)
                 logger.info("Loaded subchat monitor state (%d entries)", len(loaded))
         except Exception as e:
             logger.exception("Failed to load state: %s", e)
+        self._replay_log(loaded)
+        for sid, status in loaded.items():
+            self._shard(sid).statuses[sid] = status
+        with self._lock:
+            self._snapshot = loaded
 
-    def _save_state(self):
+    def _replay_log(self, registry: Dict[str, SubchatStatus]):
+        """Apply delta-log records written after the last snapshot."""
+        if not self.log_path.exists():
+            return
+        ops = 0
         try:
-            to_save = {sid: s.to_dict() for sid, s in self.registry.items()}
-            self.state_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.state_path, "w", encoding="utf-8") as f:
-                json.dump(to_save, f, indent=2)
-            logger.debug("Saved state to %s", self.state_path)
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        rec = _loads(line)
+                    except ValueError:
+                        continue  # torn tail from a crash mid-append
+                    ops += 1
+                    sid, op = rec.get("id"), rec.get("op")
+                    if op == "hb":
+                        if sid in registry:
+                            registry[sid].last_heartbeat_ns = _wall_to_mono(float(rec["ts"]))
+                    elif op == "put":
+                        registry[sid] = SubchatStatus.from_dict(rec["status"], sid)
+                    elif op == "del":
+                        registry.pop(sid, None)
         except Exception as e:
-            logger.exception("Failed to save state: %s", e)
+            logger.exception("Failed to replay state log: %s", e)
+        # count replayed records toward the next snapshot
+        self._log_base = -ops
+        if ops:
+            logger.info("Replayed %d state log records", ops)
+
+    def _publish_add(self, sid: str, status: SubchatStatus):
+        """Republish the reader snapshot with `sid` added; caller holds its shard lock."""
+        with self._lock:
+            snapshot = dict(self._snapshot)
+            snapshot[sid] = status
+            self._snapshot = snapshot
+
+    def _publish_remove(self, sid: str):
+        with self._lock:
+            snapshot = dict(self._snapshot)
+            snapshot.pop(sid, None)
+            self._snapshot = snapshot
+
+    def _log_event(self, shard: _Shard, rec: Dict):
+        """
+        Append one delta record through the shard's descriptor (O_APPEND, so
+        shards never interleave within a line); schedule a snapshot once the
+        log is long. Caller holds the shard lock.
+        """
+        try:
+            if shard.log_fd is None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                shard.log_fd = os.open(self.log_path, _LOG_FLAGS, 0o644)
+            os.write(shard.log_fd, _dumps(rec) + b"\n")
+        except Exception as e:
+            logger.exception("Failed to append state log: %s", e)
+            return
+        if next(self._log_seq) - self._log_base > max(1000, 2 * len(self._snapshot)):
+            self._save_state()
+
+    def _log_put(self, shard: _Shard, status: SubchatStatus):
+        self._log_event(shard, {"op": "put", "id": status.id, "status": status.to_dict()})
+
+    def _close_logs(self):
+        """Close every shard's log descriptor; caller holds all shard locks."""
+        for shard in self._shards:
+            if shard.log_fd is not None:
+                os.close(shard.log_fd)
+                shard.log_fd = None
+
+    def _lock_all(self):
+        for shard in self._shards:
+            shard.lock.acquire()
+        self._lock.acquire()
+
+    def _unlock_all(self):
+        self._lock.release()
+        for shard in reversed(self._shards):
+            shard.lock.release()
+
+    def _save_state(self):
+        """Schedule a snapshot (debounced; see _writer_loop). Caller holds a shard lock."""
+        self._dirty.set()
+        if self._writer_thread is None:
+            # callers hold different shard locks, so only _lock makes the
+            # check-then-start atomic (one writer thread, never two)
+            with self._lock:
+                if self._writer_thread is None:
+                    self._writer_thread = threading.Thread(
+                        target=self._writer_loop, daemon=True, name="subchat-monitor-writer"
+                    )
+                    self._writer_thread.start()
+
+    def _writer_loop(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.save_debounce)
+            if self._dirty.is_set():
+                self._flush()
+
+    def _pending_log_ops(self) -> bool:
+        """True if records were appended since the last snapshot (may over-report by one)."""
+        return next(self._log_seq) - self._log_base > 0
+
+    def _flush(self):
+        """
+        Write a full snapshot and truncate the delta log. Holds every shard
+        lock (briefly stopping the world) so no append can land between the
+        snapshot and the truncate.
+        """
+        self._lock_all()
+        try:
+            self._dirty.clear()
+            to_save = {sid: s.to_dict() for shard in self._shards for sid, s in shard.statuses.items()}
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.state_path.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(_dumps(to_save, pretty=True))
+                    f.flush()
+                    os.fsync(f.fileno())  # durable before the rename publishes it
+                os.replace(tmp, self.state_path)
+                self._close_logs()
+                if self.log_path.exists():
+                    self.log_path.unlink()
+                self._log_base = next(self._log_seq) + 1
+                logger.debug("Saved state to %s", self.state_path)
+            except Exception as e:
+                logger.exception("Failed to save state: %s", e)
+        finally:
+            self._unlock_all()
 
     # ------------------------
     # Registry management
     # ------------------------
     def register_subchat(self, sid: str, name: Optional[str] = None, metadata: Optional[Dict] = None) -> SubchatStatus:
-        with self._lock:
-            if sid in self.registry:
-                status = self.registry[sid]
-                if name:
-                    status.name = name
-                if metadata:
-                    status.metadata.update(metadata)
-                logger.debug("Updated registration for subchat '%s'", sid)
-            else:
-                status = SubchatStatus(id=sid, name=name, metadata=metadata or {})
-                self.registry[sid] = status
-                logger.info("Registered subchat '%s' (name=%s)", sid, name)
-            self._save_state()
-            return status
+        shard = self._shard(sid)
+        with shard.lock:
+            return self._register_locked(shard, sid, name, metadata)
+
+    def _register_locked(
+        self, shard: _Shard, sid: str, name: Optional[str] = None, metadata: Optional[Dict] = None
+    ) -> SubchatStatus:
+        """register_subchat body; caller holds the shard lock."""
+        status = shard.statuses.get(sid)
+        if status is not None:
+            if name:
+                status.name = name
+            if metadata:
+                status.metadata.update(metadata)
+            logger.debug("Updated registration for subchat '%s'", sid)
+        else:
+            status = SubchatStatus(id=sid, name=name, metadata=metadata or {})
+            shard.statuses[sid] = status
+            self._publish_add(sid, status)
+            logger.info("Registered subchat '%s' (name=%s)", sid, name)
+        self._log_put(shard, status)
+        return status
 
     def unregister_subchat(self, sid: str) -> bool:
-        with self._lock:
-            if sid in self.registry:
-                del self.registry[sid]
+        shard = self._shard(sid)
+        with shard.lock:
+            if sid in shard.statuses:
+                del shard.statuses[sid]
+                self._publish_remove(sid)
                 logger.info("Unregistered subchat '%s'", sid)
-                self._save_state()
+                self._log_event(shard, {"op": "del", "id": sid})
                 return True
             return False
 
     def heartbeat(self, sid: str) -> SubchatStatus:
         """Record a heartbeat (should be called periodically by subchat)."""
-        with self._lock:
-            if sid not in self.registry:
-                self.register_subchat(sid)
-            status = self.registry[sid]
+        shard = self._shard(sid)
+        with shard.lock:
+            status = shard.statuses.get(sid)
+            if status is None:
+                status = self._register_locked(shard, sid)
             prev_state = status.state
-            status.last_heartbeat = time.time()
-            if prev_state in ("degraded", "offline", "recovering"):
+            status.last_heartbeat_ns = time.monotonic_ns()
+            recovered = prev_state in ("degraded", "offline", "recovering")
+            if recovered:
                 status.state = "healthy"
                 logger.info("Subchat '%s' recovered -> healthy", sid)
-                if self.on_recover:
-                    try:
-                        self.on_recover(status)
-                    except Exception:
-                        logger.exception("on_recover callback failed for %s", sid)
-            self._save_state()
+                self._log_put(shard, status)
+            else:
+                self._log_event(shard, {"op": "hb", "id": sid, "ts": time.time()})
             logger.debug("Heartbeat received for '%s' (prev_state=%s)", sid, prev_state)
-            return status
+
+        # callback outside the lock (it may call back into the monitor)
+        if recovered and self.on_recover:
+            try:
+                self.on_recover(status)
+            except Exception:
+                logger.exception("on_recover callback failed for %s", sid)
+        return status
 
     def get_status(self, sid: str) -> Optional[SubchatStatus]:
-        with self._lock:
-            return self.registry.get(sid)
+        return self._snapshot.get(sid)
 
     def get_all_statuses(self) -> Dict[str, SubchatStatus]:
-        with self._lock:
-            return dict(self.registry)
+        return dict(self._snapshot)
 
     # ------------------------
     # Monitoring loop
     # ------------------------
+    @staticmethod
+    def _due_vectorized(snapshot: Dict[str, SubchatStatus], now_ns: int, limit_ns: int, offline_ns: int):
+        """Timeout candidates via one element-wise comparison over column arrays."""
+        items = list(snapshot.items())
+        n = len(items)
+        hbs = np.fromiter((s.last_heartbeat_ns for _, s in items), dtype=np.int64, count=n)
+        codes = np.fromiter((_STATE_CODES.get(s.state, -1) for _, s in items), dtype=np.int8, count=n)
+        age = now_ns - hbs
+        mask = ((codes == 0) & (age > limit_ns)) | ((codes == 1) & (age > offline_ns))
+        return [items[i] for i in np.flatnonzero(mask)]
+
     def _check_timeouts(self):
-        now = time.time()
+        now_ns = time.monotonic_ns()
+        limit_ns = self._timeout_ns
+        offline_ns = limit_ns * 3
+        # Lock-free scan of the published snapshot; usually nothing is due.
+        snapshot = self._snapshot
+        if np is not None and len(snapshot) >= _VECTORIZE_MIN:
+            due = self._due_vectorized(snapshot, now_ns, limit_ns, offline_ns)
+        else:
+            due = [
+                (sid, status)
+                for sid, status in snapshot.items()
+                if (status.state == "healthy" and now_ns - status.last_heartbeat_ns > limit_ns)
+                or (status.state == "degraded" and now_ns - status.last_heartbeat_ns > offline_ns)
+            ]
+        if not due:
+            return
+
         timed_out = []
-        with self._lock:
-            for sid, status in self.registry.items():
-                age = now - status.last_heartbeat
-                if status.state == "healthy" and age > self.timeout_seconds:
+        for sid, status in due:
+            shard = self._shard(sid)
+            with shard.lock:
+                if shard.statuses.get(sid) is not status:
+                    continue  # unregistered since the scan
+                # re-evaluate under the lock: a heartbeat may have just landed
+                age_ns = now_ns - status.last_heartbeat_ns
+                if status.state == "healthy" and age_ns > limit_ns:
                     status.state = "degraded"
-                    timed_out.append(status)
-                    logger.warning("Subchat '%s' degraded (last_heartbeat=%.1fs ago)", sid, age)
-                elif status.state == "degraded" and age > (self.timeout_seconds * 3):
+                    logger.warning("Subchat '%s' degraded (last_heartbeat=%.1fs ago)", sid, age_ns / 1e9)
+                elif status.state == "degraded" and age_ns > offline_ns:
                     status.state = "offline"
-                    timed_out.append(status)
-                    logger.error("Subchat '%s' marked offline (last_heartbeat=%.1fs ago)", sid, age)
-            if timed_out:
-                self._save_state()
+                    logger.error("Subchat '%s' marked offline (last_heartbeat=%.1fs ago)", sid, age_ns / 1e9)
+                else:
+                    continue
+                timed_out.append(status)
+                self._log_put(shard, status)
 
         # callbacks outside lock
         for s in timed_out:
@@ -199,15 +455,16 @@ class SubchatMonitor:
                 except Exception:
                     logger.exception("on_timeout callback failed for %s", s.id)
 
-    def _monitor_loop(self):
+    def _monitor_loop(self, stop_event: threading.Event):
         logger.info("SubchatMonitor started (interval=%ss, timeout=%ss)", self.monitor_interval, self.timeout_seconds)
         try:
-            while self._running:
+            while True:
                 try:
                     self._check_timeouts()
                 except Exception:
                     logger.exception("Error during timeout check")
-                time.sleep(self.monitor_interval)
+                if stop_event.wait(self.monitor_interval):
+                    break
         finally:
             logger.info("SubchatMonitor stopped")
 
@@ -217,49 +474,69 @@ class SubchatMonitor:
                 logger.debug("Monitor already running")
                 return
             self._running = True
-            self._thread = threading.Thread(target=self._monitor_loop, daemon=True, name="subchat-monitor")
+            # fresh event per run, so a loop still winding down can't be revived
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(
+                target=self._monitor_loop, args=(self._stop_event,), daemon=True, name="subchat-monitor"
+            )
             self._thread.start()
 
     def stop(self, join: bool = True):
         with self._lock:
             self._running = False
+            self._stop_event.set()
         if join and self._thread:
             self._thread.join(timeout=5.0)
             self._thread = None
+        # fold the delta log into the snapshot on shutdown
+        if self._dirty.is_set() or self._pending_log_ops():
+            self._flush()
 
     # ------------------------
     # Utilities
     # ------------------------
     def force_mark_offline(self, sid: str) -> bool:
-        with self._lock:
-            s = self.registry.get(sid)
+        shard = self._shard(sid)
+        with shard.lock:
+            s = shard.statuses.get(sid)
             if s:
                 s.state = "offline"
-                self._save_state()
+                self._log_put(shard, s)
                 logger.info("Subchat '%s' forced offline", sid)
                 return True
             return False
 
     def force_mark_healthy(self, sid: str) -> bool:
-        with self._lock:
-            s = self.registry.get(sid)
+        shard = self._shard(sid)
+        with shard.lock:
+            s = shard.statuses.get(sid)
             if s:
                 s.state = "healthy"
-                s.last_heartbeat = time.time()
-                self._save_state()
+                s.last_heartbeat_ns = time.monotonic_ns()
+                self._log_put(shard, s)
                 logger.info("Subchat '%s' forced healthy", sid)
                 return True
             return False
 
     def clear_registry(self):
-        with self._lock:
-            self.registry = {}
+        self._lock_all()
+        try:
+            for shard in self._shards:
+                shard.statuses.clear()
+            self._snapshot = {}
+            self._dirty.clear()  # drop any pending write of the old registry
+            self._close_logs()
+            self._log_base = next(self._log_seq) + 1
             try:
                 if self.state_path.exists():
                     self.state_path.unlink()
+                if self.log_path.exists():
+                    self.log_path.unlink()
                 logger.info("Cleared subchat registry and removed state file")
             except Exception:
                 logger.exception("Failed to remove state file")
+        finally:
+            self._unlock_all()
 
     # context manager
     def __enter__(self):
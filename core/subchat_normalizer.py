@@ -6,6 +6,14 @@
 import re
 import unicodedata
 
+# C0 controls (except \t \n \r) and DEL, deleted in one str.translate pass
+_INVALID_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+
+# Compiled once at import; the methods below call .sub() directly instead of
+# going through re.sub's pattern-cache lookup on every message.
+_WS_RE = re.compile(r"\s+")
+_NL_RE = re.compile(r" ?\n ?")
+
 class SubChatNormalizer:
     def __init__(self):
         # Define normalization rules
@@ -25,10 +33,11 @@ class SubChatNormalizer:
 
         return text.strip()
 
-    def _strip_invalid_chars(self, text: str) -> str:
+    @staticmethod
+    def _strip_invalid_chars(text: str) -> str:
         """Remove characters that should never appear in SubChats."""
         # Remove null bytes, terminal control escape sequences, etc.
-        return re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]", "", text)
+        return text.translate(_INVALID_TABLE)
 
     def _normalize_unicode(self, text: str) -> str:
         """Normalize unicode so all text is consistent."""
@@ -38,14 +47,21 @@ class SubChatNormalizer:
             # remove all non-ascii chars
             return text.encode("ascii", "ignore").decode()
 
-    def _standardize_whitespace(self, text: str) -> str:
+    @staticmethod
+    def _standardize_whitespace(text: str) -> str:
         """Ensure whitespace is clean and predictable."""
-        text = re.sub(r"\s+", " ", text)  # collapse multiple spaces
-        text = re.sub(r" ?\n ?", "\n", text)  # clean up newlines
+        text = _WS_RE.sub(" ", text)  # collapse multiple spaces
+        text = _NL_RE.sub("\n", text)  # clean up newlines
         return text
 
-    def _sanitize_control_characters(self, text: str) -> str:
+    @staticmethod
+    def _sanitize_control_characters(text: str) -> str:
         """Remove hidden or control characters that may disrupt logs."""
+        # Common case: nothing to drop, and str.isprintable() checks the
+        # whole string in C. Only odd input (format chars, unassigned code
+        # points, ...) pays for the per-character filter.
+        if text.isprintable():
+            return text
         return "".join(ch for ch in text if ch.isprintable() or ch in "\n\t")
 
     def _limit_length(self, text: str) -> str:
@@ -13,15 +13,52 @@ Design goals:
 """
 
 from __future__ import annotations
+import concurrent.futures
 import importlib
+import itertools
 import json
+import os
 import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
+
+from core._json import dumps as _dumps, loads as _loads
+from core._persist import DebouncedWriter
+
+
+def _encode_entry(entry: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Encode a message-log entry without ever failing the route: values JSON
+    can't represent (objects, ints beyond 64 bits for orjson) are stringified.
+    Returns None if the entry still can't be encoded (e.g. a reference cycle).
+    """
+    try:
+        return _dumps(entry)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    try:
+        return json.dumps(entry, ensure_ascii=False, default=str).encode("utf-8")
+    except (TypeError, ValueError, OverflowError):
+        return None
+
 
 ROOT = Path(__file__).resolve().parents[2]  # .../System
 CORE_DIR = ROOT / "core"
 STATE_PATH = CORE_DIR / "subchat_state.json"
+# Append-only delta log replayed on top of STATE_PATH; folded into a fresh
+# snapshot every _SNAPSHOT_EVERY records.
+STATE_LOG_PATH = STATE_PATH.with_suffix(".log")
+_SNAPSHOT_EVERY = 1000
+_MESSAGE_LOG_MAX = 1000  # in-memory/persisted message_log length
+_BROADCAST_WORKERS = 8
+# message-log records are coalesced and written by a background flusher at
+# most once per interval (seconds) instead of once per routed message
+_MSG_FLUSH_INTERVAL = 0.1
+# registry fields with a secondary index (value -> subchat ids) for broadcast
+_INDEXED_FIELDS = ("owner", "state")
+_LOG_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
 
 # Try to import optional sub-modules. If absent, we keep None and fallback to internal logic.
 def _try_import(name: str):
@@ -37,16 +74,42 @@ _subchat_policy = _try_import("core.subchat_policy")
 _subchat_security = _try_import("core.subchat_security")
 _subchat_integrator = _try_import("core.subchat_integrator")
 
+# Resolve optional hooks once; hot paths test these instead of hasattr().
+_rt_start = getattr(_subchat_runtime, "start_subchat", None)
+_rt_stop = getattr(_subchat_runtime, "stop_subchat", None)
+_rt_deliver = getattr(_subchat_runtime, "deliver_message", None)
+_router_route = getattr(_subchat_router, "route", None)
+_policy_apply = getattr(_subchat_policy, "apply_policy", None)
+_policy_update = getattr(_subchat_policy, "update_policy", None)
+_sec_authorize = getattr(_subchat_security, "authorize_message", None)
+_sec_add_rule = getattr(_subchat_security, "add_rule", None)
+
 
 class SubchatOrchestrator:
     def __init__(self):
-        self._lock = threading.RLock()
+        # Plain Lock: no method re-acquires it (internal helpers expect the
+        # caller to hold it), which is cheaper than RLock's owner tracking.
+        self._lock = threading.Lock()
         # registry: id -> metadata/state
         self.registry: Dict[str, Dict[str, Any]] = {}
         # in-memory message logs for quick inspection (kept small)
-        self.message_log: List[Dict[str, Any]] = []
+        self.message_log: Deque[Dict[str, Any]] = deque(maxlen=_MESSAGE_LOG_MAX)
+        # compact JSON of each message_log entry (same order), encoded once in
+        # _append_log and reused by the delta log and every snapshot
+        self._message_log_json: Deque[bytes] = deque(maxlen=_MESSAGE_LOG_MAX)
+        self._log_fd: Optional[int] = None
+        self._log_ops = 0
+        # encoded "msg" delta lines not yet written; drained by flush()
+        self._pending_msgs: List[bytes] = []
+        # one delta-log write per _MSG_FLUSH_INTERVAL burst of messages
+        self._flusher = DebouncedWriter(_MSG_FLUSH_INTERVAL, self._write_pending)
+        # broadcast fan-out pool, created on first multi-target broadcast
+        self._broadcast_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        # field -> value -> ids, for _INDEXED_FIELDS; kept in step with registry
+        self._index: Dict[str, Dict[Any, set]] = {f: {} for f in _INDEXED_FIELDS}
         # load persisted state if available
         self._load_state()
+        self._rebuild_index()
 
     # -----------------------
     # Persistence
@@ -54,26 +117,157 @@ class SubchatOrchestrator:
     def _load_state(self):
         try:
             if STATE_PATH.exists():
-                with open(STATE_PATH, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(STATE_PATH, "rb") as f:
+                    data = _loads(f.read())
                 # basic validation
                 if isinstance(data, dict):
                     self.registry = data.get("registry", {})
-                    self.message_log = data.get("message_log", [])[-1000:]
+                    self.message_log = deque(data.get("message_log", []), maxlen=_MESSAGE_LOG_MAX)
         except Exception:
             # if anything fails, start with empty state
             self.registry = {}
-            self.message_log = []
+            self.message_log = deque(maxlen=_MESSAGE_LOG_MAX)
+        self._replay_log()
+        self._message_log_json = deque((_dumps(e) for e in self.message_log), maxlen=_MESSAGE_LOG_MAX)
+
+    def _replay_log(self):
+        """Apply delta records appended since the last snapshot."""
+        if not STATE_LOG_PATH.exists():
+            return
+        ops = 0
+        try:
+            with open(STATE_LOG_PATH, "rb") as f:
+                for line in f:
+                    try:
+                        rec = _loads(line)
+                    except ValueError:
+                        continue  # torn tail from a crash mid-append
+                    ops += 1
+                    op = rec.get("op")
+                    if op == "put":
+                        self.registry[rec["id"]] = rec["meta"]
+                    elif op == "del":
+                        self.registry.pop(rec["id"], None)
+                    elif op == "msg":
+                        entry = rec["entry"]
+                        self.message_log.append(entry)
+                        to_id = entry.get("to")
+                        if to_id and to_id in self.registry:
+                            self.registry[to_id]["last_active"] = entry["timestamp"]
+        except Exception:
+            pass
+        self._log_ops = ops
+
+    def _log_op(self, rec: Optional[Dict[str, Any]]):
+        """
+        Append one delta record (plus any pending message records) in a single
+        write; snapshot once the log is long. rec=None just drains the pending
+        records. Caller must hold self._lock.
+        """
+        # pending message records go first so the log keeps routing order
+        lines = self._pending_msgs
+        self._pending_msgs = []
+        if rec is not None:
+            lines.append(_dumps(rec) + b"\n")
+        if not lines:
+            return
+        try:
+            if self._log_fd is None:
+                STATE_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+                self._log_fd = os.open(STATE_LOG_PATH, _LOG_FLAGS, 0o644)
+            os.write(self._log_fd, b"".join(lines))
+            self._log_ops += len(lines)
+        except Exception:
+            return
+        if self._log_ops >= _SNAPSHOT_EVERY:
+            self._save_state()
+
+    def _log_put(self, subchat_id: str):
+        meta = self.registry.get(subchat_id)
+        if meta is not None:
+            self._log_op({"op": "put", "id": subchat_id, "meta": meta})
 
     def _save_state(self):
+        """
+        Full snapshot of registry + message log; truncates the delta log.
+        Caller must hold self._lock.
+        """
         try:
             STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            payload = {"registry": self.registry, "message_log": self.message_log[-1000:]}
-            with open(STATE_PATH, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
+            # only the registry is re-encoded; messages reuse their cached JSON
+            payload = b"".join((
+                b'{"registry":', _dumps(self.registry),
+                b',"message_log":[', b",".join(self._message_log_json), b"]}",
+            ))
+            tmp = STATE_PATH.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())  # durable before the rename publishes it
+            os.replace(tmp, STATE_PATH)
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+            if STATE_LOG_PATH.exists():
+                STATE_LOG_PATH.unlink()
+            self._log_ops = 0
+            self._pending_msgs = []  # already part of the snapshot
         except Exception:
             pass
 
+    # -----------------------
+    # Secondary indexes (caller holds self._lock)
+    # -----------------------
+    def _rebuild_index(self):
+        self._index = {f: {} for f in _INDEXED_FIELDS}
+        for sid, meta in self.registry.items():
+            self._index_add(sid, meta)
+
+    def _index_add(self, subchat_id: str, meta: Dict[str, Any]):
+        for field in _INDEXED_FIELDS:
+            try:
+                self._index[field].setdefault(meta.get(field), set()).add(subchat_id)
+            except TypeError:
+                pass  # unhashable value: only reachable through the scan path
+
+    def _index_remove(self, subchat_id: str, meta: Dict[str, Any]):
+        for field in _INDEXED_FIELDS:
+            try:
+                self._index[field].get(meta.get(field), set()).discard(subchat_id)
+            except TypeError:
+                pass
+
+    def _set_state(self, subchat_id: str, meta: Dict[str, Any], state: str):
+        """Change meta["state"] and keep the state index in step."""
+        if self.registry.get(subchat_id) is meta:
+            by_state = self._index["state"]
+            by_state.get(meta.get("state"), set()).discard(subchat_id)
+            by_state.setdefault(state, set()).add(subchat_id)
+        meta["state"] = state
+
+    def _select_targets(self, target_filter: Optional[Dict[str, Any]]) -> List[str]:
+        """Subchat ids matching every key/value in target_filter."""
+        if not target_filter:
+            return list(self.registry)
+        candidates: Optional[set] = None
+        for field in _INDEXED_FIELDS:
+            if field not in target_filter:
+                continue
+            try:
+                ids = self._index[field].get(target_filter[field], set())
+            except TypeError:
+                continue
+            candidates = set(ids) if candidates is None else candidates & ids
+        pool = self.registry if candidates is None else candidates
+        targets = []
+        # candidates are re-checked against the full filter, so compound
+        # filters (and any non-indexed keys) still match exactly
+        for sid in pool:
+            meta = self.registry.get(sid)
+            if meta is not None and all(meta.get(k) == v for k, v in target_filter.items()):
+                targets.append(sid)
+        return targets
+
     # -----------------------
     # Lifecycle operations
     # -----------------------
@@ -90,10 +284,11 @@ class SubchatOrchestrator:
                 "owner": owner,
                 "config": cfg,
                 "state": "created",
-                "created_at": __import__("time").time(),
+                "created_at": time.time(),
                 "last_active": None,
             }
-            self._save_state()
+            self._index_add(subchat_id, self.registry[subchat_id])
+            self._log_put(subchat_id)
             return {"status": "ok", "id": subchat_id}
 
     def start_subchat(self, subchat_id: str) -> Dict[str, Any]:
@@ -108,26 +303,26 @@ class SubchatOrchestrator:
             if meta.get("state") in ("running", "starting"):
                 return {"status": "ok", "state": meta.get("state")}
 
-            meta["state"] = "starting"
-            self._save_state()
+            self._set_state(subchat_id, meta, "starting")
+            self._log_put(subchat_id)
 
         # Attempt to start via runtime module
         try:
-            if _subchat_runtime and hasattr(_subchat_runtime, "start_subchat"):
-                res = _subchat_runtime.start_subchat(subchat_id, meta)
+            if _rt_start:
+                res = _rt_start(subchat_id, meta)
                 with self._lock:
-                    meta["state"] = "running" if res.get("status") == "ok" else "error"
-                    meta["last_active"] = __import__("time").time()
-                    self._save_state()
+                    self._set_state(subchat_id, meta, "running" if res.get("status") == "ok" else "error")
+                    meta["last_active"] = time.time()
+                    self._log_put(subchat_id)
                 return {"status": "ok", "detail": res}
         except Exception:
             pass
 
         # Fallback: mark running (no-op runtime)
         with self._lock:
-            meta["state"] = "running"
-            meta["last_active"] = __import__("time").time()
-            self._save_state()
+            self._set_state(subchat_id, meta, "running")
+            meta["last_active"] = time.time()
+            self._log_put(subchat_id)
         return {"status": "ok", "detail": "runtime_fallback"}
 
     def stop_subchat(self, subchat_id: str) -> Dict[str, Any]:
@@ -135,36 +330,42 @@ class SubchatOrchestrator:
             meta = self.registry.get(subchat_id)
             if not meta:
                 return {"status": "error", "error": "not_found"}
-            meta["state"] = "stopping"
-            self._save_state()
+            self._set_state(subchat_id, meta, "stopping")
+            self._log_put(subchat_id)
 
         try:
-            if _subchat_runtime and hasattr(_subchat_runtime, "stop_subchat"):
-                res = _subchat_runtime.stop_subchat(subchat_id)
+            if _rt_stop:
+                res = _rt_stop(subchat_id)
                 with self._lock:
-                    meta["state"] = "stopped" if res.get("status") == "ok" else "error"
-                    self._save_state()
+                    self._set_state(subchat_id, meta, "stopped" if res.get("status") == "ok" else "error")
+                    self._log_put(subchat_id)
                 return {"status": "ok", "detail": res}
         except Exception:
             pass
 
         with self._lock:
-            meta["state"] = "stopped"
-            self._save_state()
+            self._set_state(subchat_id, meta, "stopped")
+            self._log_put(subchat_id)
         return {"status": "ok", "detail": "stopped_fallback"}
 
     def remove_subchat(self, subchat_id: str) -> Dict[str, Any]:
         with self._lock:
-            if subchat_id not in self.registry:
+            meta = self.registry.get(subchat_id)
+            if meta is None:
+                return {"status": "error", "error": "not_found"}
+            running = meta.get("state") == "running"
+        # stop if running (outside the lock: stop_subchat takes it itself)
+        if running:
+            try:
+                self.stop_subchat(subchat_id)
+            except Exception:
+                pass
+        with self._lock:
+            meta = self.registry.pop(subchat_id, None)
+            if meta is None:
                 return {"status": "error", "error": "not_found"}
-            # stop if running
-            if self.registry[subchat_id].get("state") == "running":
-                try:
-                    self.stop_subchat(subchat_id)
-                except Exception:
-                    pass
-            del self.registry[subchat_id]
-            self._save_state()
+            self._index_remove(subchat_id, meta)
+            self._log_op({"op": "del", "id": subchat_id})
             return {"status": "ok"}
 
     def list_subchats(self) -> List[Dict[str, Any]]:
@@ -184,13 +385,13 @@ class SubchatOrchestrator:
             "to": to_id,
             "message": message,
             "metadata": metadata or {},
-            "timestamp": __import__("time").time(),
+            "timestamp": time.time(),
         }
 
         # Security check
-        if _subchat_security and hasattr(_subchat_security, "authorize_message"):
+        if _sec_authorize:
             try:
-                allowed = _subchat_security.authorize_message(from_id, to_id, message, entry["metadata"])
+                allowed = _sec_authorize(from_id, to_id, message, entry["metadata"])
                 if not allowed:
                     entry["rejected_by_security"] = True
                     self._append_log(entry)
@@ -202,9 +403,9 @@ class SubchatOrchestrator:
                 return {"status": "error", "error": "security_module_error"}
 
         # Policy check
-        if _subchat_policy and hasattr(_subchat_policy, "apply_policy"):
+        if _policy_apply:
             try:
-                policy_ok = _subchat_policy.apply_policy(from_id, to_id, message, entry["metadata"])
+                policy_ok = _policy_apply(from_id, to_id, message, entry["metadata"])
                 if not policy_ok:
                     entry["rejected_by_policy"] = True
                     self._append_log(entry)
@@ -216,8 +417,8 @@ class SubchatOrchestrator:
 
         # Route via router/integrator if available
         try:
-            if _subchat_router and hasattr(_subchat_router, "route"):
-                routed = _subchat_router.route(from_id, to_id, message, entry["metadata"])
+            if _router_route:
+                routed = _router_route(from_id, to_id, message, entry["metadata"])
                 entry["routed_via"] = "router"
                 self._append_log(entry)
                 return {"status": "ok", "detail": routed}
@@ -226,8 +427,8 @@ class SubchatOrchestrator:
 
         # Fallback: deliver to runtime handler if present
         try:
-            if _subchat_runtime and hasattr(_subchat_runtime, "deliver_message"):
-                delivered = _subchat_runtime.deliver_message(to_id, from_id, message, entry["metadata"])
+            if _rt_deliver:
+                delivered = _rt_deliver(to_id, from_id, message, entry["metadata"])
                 entry["delivered"] = True
                 self._append_log(entry)
                 return {"status": "ok", "detail": delivered}
@@ -244,37 +445,55 @@ class SubchatOrchestrator:
         Broadcast message to multiple subchats matching the target_filter (e.g., owner, state).
         """
         with self._lock:
-            targets = []
-            for sid, meta in self.registry.items():
-                ok = True
-                if target_filter:
-                    for k, v in target_filter.items():
-                        if meta.get(k) != v:
-                            ok = False
-                            break
-                if ok:
-                    targets.append(sid)
-
-        results = {}
-        for t in targets:
-            results[t] = self.route_message(from_id, t, message)
+            targets = self._select_targets(target_filter)
+
+        if len(targets) > 1:
+            pool = self._get_broadcast_pool()
+            routed = pool.map(lambda t: self.route_message(from_id, t, message), targets)
+        else:
+            routed = [self.route_message(from_id, t, message) for t in targets]
+        results = dict(zip(targets, routed))
         return {"status": "ok", "results": results}
 
+    def _get_broadcast_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        pool = self._broadcast_pool
+        if pool is None:
+            with self._lock:
+                pool = self._broadcast_pool
+                if pool is None:
+                    pool = self._broadcast_pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=_BROADCAST_WORKERS, thread_name_prefix="subchat-broadcast"
+                    )
+        return pool
+
     def _append_log(self, entry: Dict[str, Any]):
+        encoded = _encode_entry(entry)
         with self._lock:
+            # bounded deques: the oldest message drops off in O(1)
             self.message_log.append(entry)
-            # keep last 1000 messages
-            if len(self.message_log) > 1000:
-                self.message_log = self.message_log[-1000:]
             # update last_active for destination
             to_id = entry.get("to")
             if to_id and to_id in self.registry:
                 self.registry[to_id]["last_active"] = entry["timestamp"]
-            self._save_state()
+            if encoded is None:
+                # unencodable entry: keep it in memory only, never fail the route
+                return
+            self._message_log_json.append(encoded)
+            self._pending_msgs.append(b'{"op":"msg","entry":' + encoded + b"}\n")
+        self._flusher.schedule()
+
+    def _write_pending(self):
+        with self._lock:
+            self._log_op(None)
+
+    def flush(self):
+        """Write any coalesced message-log records to the delta log now."""
+        self._flusher.flush()
 
     def get_recent_messages(self, limit: int = 50) -> List[Dict[str, Any]]:
         with self._lock:
-            return list(self.message_log[-limit:])
+            start = max(0, len(self.message_log) - limit)
+            return list(itertools.islice(self.message_log, start, None))
 
     # -----------------------
     # Policy & Security helpers
@@ -285,11 +504,11 @@ class SubchatOrchestrator:
             if not meta:
                 return {"status": "error", "error": "not_found"}
             meta.setdefault("config", {})["policy"] = policy_blob
-            self._save_state()
+            self._log_put(subchat_id)
             # if module exists, notify it
             try:
-                if _subchat_policy and hasattr(_subchat_policy, "update_policy"):
-                    _subchat_policy.update_policy(subchat_id, policy_blob)
+                if _policy_update:
+                    _policy_update(subchat_id, policy_blob)
             except Exception:
                 pass
             return {"status": "ok"}
@@ -297,8 +516,8 @@ class SubchatOrchestrator:
     def enforce_security_rule(self, rule: Dict[str, Any]) -> Dict[str, Any]:
         # Best-effort push to security module
         try:
-            if _subchat_security and hasattr(_subchat_security, "add_rule"):
-                _subchat_security.add_rule(rule)
+            if _sec_add_rule:
+                _sec_add_rule(rule)
                 return {"status": "ok"}
         except Exception:
             pass
@@ -317,7 +536,7 @@ class SubchatOrchestrator:
             if not meta:
                 return {"status": "error", "error": "not_found"}
             meta.setdefault("config", {})[key] = value
-            self._save_state()
+            self._log_put(subchat_id)
             return {"status": "ok"}
 
     # -----------------------
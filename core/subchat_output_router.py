@@ -18,6 +18,32 @@ class SubChatOutputRouter:
         self.renderer = renderer
         self.logger = logger
         self.policy = policy
+        # subchat_id -> tuple of optional stages the policy allows
+        self._pipeline_cache = {}
+
+    def invalidate(self, subchat_id=None):
+        """Drop cached routing pipelines (one subchat, or all) after a policy change."""
+        if subchat_id is None:
+            self._pipeline_cache.clear()
+        else:
+            self._pipeline_cache.pop(subchat_id, None)
+
+    def _pipeline(self, subchat_id):
+        """Resolve (and cache) which optional stages apply to this subchat."""
+        pipeline = self._pipeline_cache.get(subchat_id)
+        if pipeline is None:
+            stages = []
+            # Export if allowed
+            if self.policy.allows_export(subchat_id):
+                stages.append(self._export_message)
+            # Notify parent chat if allowed
+            if self.policy.allows_parent_notification(subchat_id):
+                stages.append(self._notify_parent)
+            # Forward to agents if the rules allow it
+            if self.policy.allows_agent_forwarding(subchat_id):
+                stages.append(self._forward_to_agents)
+            pipeline = self._pipeline_cache[subchat_id] = tuple(stages)
+        return pipeline
 
     def route_output(self, subchat_id, message, metadata=None):
         """Main entrypoint for routing outgoing SubChat messages."""
@@ -25,30 +51,22 @@ class SubChatOutputRouter:
 
         # Log the outgoing message
         self.logger.info(
-            f"[SubChat:{subchat_id}] OUT → {message} | meta={metadata}"
+            "[SubChat:%s] OUT → %s | meta=%s", subchat_id, message, metadata
         )
 
         # Render to UI
         self._send_to_ui(subchat_id, message)
 
-        # Export if allowed
-        if self.policy.allows_export(subchat_id):
-            self._export_message(subchat_id, message, metadata)
-
-        # Notify parent chat if allowed
-        if self.policy.allows_parent_notification(subchat_id):
-            self._notify_parent(subchat_id, message, metadata)
-
-        # Forward to agents if the rules allow it
-        if self.policy.allows_agent_forwarding(subchat_id):
-            self._forward_to_agents(subchat_id, message, metadata)
+        # Export / parent notification / agent forwarding, per cached policy
+        for stage in self._pipeline(subchat_id):
+            stage(subchat_id, message, metadata)
 
     def _send_to_ui(self, subchat_id, message):
         """Send cleaned output to UI renderer."""
         try:
             self.renderer.render_message(subchat_id, message)
         except Exception as e:
-            self.logger.error(f"UI render failure in SubChat {subchat_id}: {e}")
+            self.logger.error("UI render failure in SubChat %s: %s", subchat_id, e)
 
     def _export_message(self, subchat_id, message, metadata):
         """Optional export behavior (future use)."""
@@ -12,21 +12,24 @@ Responsibilities:
 
 Design notes:
 - Data is intentionally JSON-first for portability. Later DB replacement is easy.
-- This module is synchronous and light-weight (no external locking libs).
+- This module is synchronous and light-weight (no external locking libs): one
+  RLock per manager guards the in-memory DB; disk writes happen outside it.
 - The manager enforces the rule: subchats inherit from parent but do NOT change parent.
 """
 
 from __future__ import annotations
 import json
-import os
-import shutil
-import tempfile
+import sys
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 from copy import deepcopy
 import datetime
 import uuid
 
+from core._json import dumps as _dumps, loads as _loads, orjson
+from core._persist import DebouncedWriter, atomic_write as _atomic_write, synchronized as _synchronized
+
 ROOT = Path(__file__).resolve().parents[1]  # .../core -> System/core -> parents[1] = System
 STORE_PATH = ROOT / "subchat_personalities.json"
 
@@ -46,30 +49,45 @@ DEFAULT_PERSONALITY_TEMPLATE = {
     "metadata": {},
 }
 
+# Proposal statuses. Interned (and re-interned on load) so status checks hit
+# str.__eq__'s identity fast path instead of comparing characters.
+_STATUS_PENDING = sys.intern("pending")
+_STATUS_APPROVED = sys.intern("approved")
+_STATUS_REJECTED = sys.intern("rejected")
+
+# Accepted values for enforce_constraints' sanity checks
+_VALID_TONES = frozenset(("neutral", "friendly", "professional", "curt", "playful"))
+_VALID_VERBOSITY = frozenset(("terse", "balanced", "verbose"))
+
+# Encoded once; _clone_default_personality() decodes a fresh copy per use.
+_DEFAULT_TEMPLATE_BYTES = orjson.dumps(DEFAULT_PERSONALITY_TEMPLATE) if orjson is not None else None
+
+
+def _clone_default_personality() -> Dict[str, Any]:
+    if _DEFAULT_TEMPLATE_BYTES is not None:
+        return orjson.loads(_DEFAULT_TEMPLATE_BYTES)
+    return deepcopy(DEFAULT_PERSONALITY_TEMPLATE)
+
 # Traits that are protected and cannot be altered by subchats (even via propose)
-PROTECTED_TRAITS = {
+PROTECTED_TRAITS = frozenset({
     "core_integrity", "bootstrap_keys", "root_access", "system_paths", "agent_registry"
-}
+})
 
 # Minimal schema keys allowed for personality entries (helps validate)
-ALLOWED_TOP_LEVEL_KEYS = set(DEFAULT_PERSONALITY_TEMPLATE.keys()) | {"parent", "created_at", "updated_at", "pending_updates", "id"}
+ALLOWED_TOP_LEVEL_KEYS = frozenset(DEFAULT_PERSONALITY_TEMPLATE.keys()) | {"parent", "created_at", "updated_at", "pending_updates", "id"}
 
 
-def _atomic_write(path: Path, content: str):
+def _fast_clone(obj: Any) -> Any:
     """
-    Write file atomically to reduce corruption risk.
+    Deep copy of JSON-shaped data via an orjson round-trip (much cheaper than
+    deepcopy). Falls back to deepcopy without orjson or for non-JSON values.
     """
-    tmp_fd, tmp_path = tempfile.mkstemp(prefix=path.name, dir=str(path.parent))
-    try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            f.write(content)
-        shutil.move(tmp_path, path)
-    finally:
-        if os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                pass
+    if orjson is not None:
+        try:
+            return orjson.loads(orjson.dumps(obj))
+        except TypeError:
+            pass
+    return deepcopy(obj)
 
 
 class SubchatPersonalityManager:
@@ -77,17 +95,41 @@ class SubchatPersonalityManager:
     Manager for subchat personalities.
     """
 
-    def __init__(self, store_path: Optional[Path] = None):
+    def __init__(self, store_path: Optional[Path] = None, save_delay: float = 0.25):
         self.store_path = Path(store_path) if store_path else STORE_PATH
-        self._db: Dict[str, Dict[str, Any]] = {}
-        self._load_db()
+        # Loaded on first access of self._db (see the property below), so a
+        # manager that is constructed but never used costs no file I/O.
+        self._db_data: Optional[Dict[str, Dict[str, Any]]] = None
+        # Guards the in-memory DB (read-modify-write sequences and lazy load).
+        # Lock order: writer's write lock -> _write_lock -> _lock -> writer's state lock.
+        self._lock = threading.RLock()
+        # Serializes snapshot + file write so an older snapshot never lands last.
+        self._write_lock = threading.Lock()
+        # proposal_id -> (subchat_id, position in pending_updates)
+        self._proposal_index: Dict[str, Tuple[str, int]] = {}
+        # Mutations mark the DB dirty; one write per save_delay burst.
+        self._writer = DebouncedWriter(save_delay, self._save_db_now)
+
+    @property
+    def _db(self) -> Dict[str, Dict[str, Any]]:
+        db = self._db_data
+        if db is None:
+            with self._lock:
+                if self._db_data is None:
+                    self._load_db()
+                db = self._db_data
+        return db
+
+    @_db.setter
+    def _db(self, value: Dict[str, Dict[str, Any]]):
+        self._db_data = value
 
     # ---------- Persistence ----------
     def _load_db(self):
         if self.store_path.exists():
             try:
-                with open(self.store_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(self.store_path, "rb") as f:
+                    data = _loads(f.read())
                 if isinstance(data, dict):
                     self._db = data
                 else:
@@ -95,31 +137,85 @@ class SubchatPersonalityManager:
             except Exception:
                 # proceed with empty db to avoid crash
                 self._db = {}
+            # single post-parse pass over the entries (orjson has no object_hook)
+            self._proposal_index = {}
+            for sid, entry in self._db.items():
+                self._rehydrate_entry(sid, entry)
         else:
             # ensure parent dir exists
             self.store_path.parent.mkdir(parents=True, exist_ok=True)
             self._db = {}
-            self._save_db()
+            # plain write: we may hold _lock here, and _save_db_now takes _write_lock first
+            try:
+                _atomic_write(self.store_path, _dumps(self._db, pretty=True))
+            except Exception as e:
+                print("[subchat_personality] Failed to save DB:", e)
 
     def _save_db(self):
+        """Schedule a debounced write of the whole DB."""
+        self._writer.schedule()
+
+    def flush(self):
+        """Write pending changes to disk now."""
+        self._writer.flush()
+
+    def _save_db_now(self):
         try:
-            content = json.dumps(self._db, indent=2, ensure_ascii=False)
-            _atomic_write(self.store_path, content)
+            with self._write_lock:
+                # snapshot under the DB lock, write to disk outside it
+                with self._lock:
+                    content = _dumps(self._db, pretty=True)
+                _atomic_write(self.store_path, content)
         except Exception as e:
             # best-effort: print; caller should log appropriately
             print("[subchat_personality] Failed to save DB:", e)
 
+    # ---------- Proposal index ----------
+    def _rehydrate_entry(self, subchat_id: str, entry: Any):
+        """Per-entry load-time fixups: index the entry's proposals, intern their statuses."""
+        if isinstance(entry, dict):
+            self._index_proposals(subchat_id, entry)
+
+    def _index_proposals(self, subchat_id: str, entry: Dict[str, Any]):
+        for idx, p in enumerate(entry.get("pending_updates") or []):
+            if isinstance(p, dict) and "proposal_id" in p:
+                self._proposal_index[p["proposal_id"]] = (subchat_id, idx)
+                status = p.get("status")
+                if type(status) is str:
+                    p["status"] = sys.intern(status)
+
+    def _unindex_proposals(self, entry: Dict[str, Any]):
+        for p in entry.get("pending_updates") or []:
+            if isinstance(p, dict):
+                self._proposal_index.pop(p.get("proposal_id"), None)
+
+    def _find_pending(self, subchat_id: str, entry: Dict[str, Any], proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Pending proposal by id: O(1) via the index, scanning only if it is stale."""
+        pending = entry.get("pending_updates", [])
+        loc = self._proposal_index.get(proposal_id)
+        if loc is not None and loc[0] == subchat_id and loc[1] < len(pending):
+            p = pending[loc[1]]
+            if p["proposal_id"] == proposal_id:
+                return p if p["status"] == _STATUS_PENDING else None
+        for p in pending:
+            if p["proposal_id"] == proposal_id and p["status"] == _STATUS_PENDING:
+                return p
+        return None
+
     # ---------- Utilities ----------
     def _now(self) -> str:
-        return datetime.datetime.utcnow().isoformat() + "Z"
+        # same format as the old utcnow().isoformat() + "Z" (utcnow is deprecated)
+        return datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
 
     def list_subchats(self) -> List[str]:
         return list(self._db.keys())
 
+    @_synchronized
     def get(self, subchat_id: str) -> Optional[Dict[str, Any]]:
-        return deepcopy(self._db.get(subchat_id))
+        return _fast_clone(self._db.get(subchat_id))
 
     # ---------- Creation & Inheritance ----------
+    @_synchronized
     def create_subchat(
         self,
         parent_id: str,
@@ -133,16 +229,15 @@ class SubchatPersonalityManager:
         If parent_id is not found, parent defaults to a minimal template.
         """
         subchat_id = subchat_id or str(uuid.uuid4())
-        parent = deepcopy(self._db.get(parent_id, {}))
+        # read-only: only the derived personality below is a copy
+        parent = self._db.get(parent_id) or {}
+        # Start derived personality (do not change parent)
         if not parent:
             # Parent missing: start from template (this can be PRIMUS base)
-            parent_personality = deepcopy(DEFAULT_PERSONALITY_TEMPLATE)
-            parent_personality["name"] = f"derived_from_{parent_id}"
+            derived = _clone_default_personality()
+            derived["name"] = f"derived_from_{parent_id}"
         else:
-            parent_personality = deepcopy(parent.get("personality", DEFAULT_PERSONALITY_TEMPLATE))
-
-        # Start derived personality (do not change parent)
-        derived = deepcopy(parent_personality)
+            derived = _fast_clone(parent.get("personality", DEFAULT_PERSONALITY_TEMPLATE))
         # Apply overrides (but do not allow protected traits)
         if overrides:
             clean_overrides = self._filter_protected_traits(overrides)
@@ -151,18 +246,20 @@ class SubchatPersonalityManager:
         # Apply restrictions (stored separately)
         restrictions = restrictions or {}
 
+        now = self._now()
         entry = {
             "id": subchat_id,
             "parent": parent_id,
             "personality": derived,
             "restrictions": restrictions,
-            "created_at": self._now(),
-            "updated_at": self._now(),
+            "created_at": now,
+            "updated_at": now,
             "pending_updates": [],  # list of proposed updates awaiting approval
         }
 
         # initial growth metadata: inherit parent's growth but clamp to allowed max
-        entry["personality"].setdefault("growth", deepcopy(DEFAULT_PERSONALITY_TEMPLATE["growth"]))
+        if "growth" not in entry["personality"]:
+            entry["personality"]["growth"] = _clone_default_personality()["growth"]
         # If parent has growth, inherit but do not exceed parent.max_level
         if parent:
             parent_growth = parent.get("personality", {}).get("growth", {})
@@ -174,9 +271,10 @@ class SubchatPersonalityManager:
 
         self._db[subchat_id] = entry
         self._save_db()
-        return deepcopy(entry)
+        return _fast_clone(entry)
 
     # ---------- Propose / Approve workflow ----------
+    @_synchronized
     def propose_update(self, subchat_id: str, proposer: str, changes: Dict[str, Any], reason: Optional[str] = None) -> Dict[str, Any]:
         """
         Add a proposed personality update to pending_updates. Does not apply changes.
@@ -186,24 +284,29 @@ class SubchatPersonalityManager:
             return {"status": "error", "error": "subchat_not_found"}
 
         clean_changes = self._filter_protected_traits(changes)
+        now = self._now()
         proposal = {
             "proposal_id": str(uuid.uuid4()),
             "proposer": proposer,
             "changes": clean_changes,
             "reason": reason or "",
-            "created_at": self._now(),
-            "status": "pending"
+            "created_at": now,
+            "status": _STATUS_PENDING
         }
-        self._db[subchat_id].setdefault("pending_updates", []).append(proposal)
-        self._db[subchat_id]["updated_at"] = self._now()
+        pending = self._db[subchat_id].setdefault("pending_updates", [])
+        pending.append(proposal)
+        self._proposal_index[proposal["proposal_id"]] = (subchat_id, len(pending) - 1)
+        self._db[subchat_id]["updated_at"] = now
         self._save_db()
         return {"status": "ok", "proposal": proposal}
 
+    @_synchronized
     def list_proposals(self, subchat_id: str) -> List[Dict[str, Any]]:
         if subchat_id not in self._db:
             return []
-        return deepcopy(self._db[subchat_id].get("pending_updates", []))
+        return _fast_clone(self._db[subchat_id].get("pending_updates", []))
 
+    @_synchronized
     def approve_proposal(self, subchat_id: str, proposal_id: str, approver: str) -> Dict[str, Any]:
         """
         Approve and apply a pending proposal. Returns status.
@@ -212,36 +315,35 @@ class SubchatPersonalityManager:
         if not entry:
             return {"status": "error", "error": "subchat_not_found"}
 
-        for p in entry.get("pending_updates", []):
-            if p["proposal_id"] == proposal_id and p["status"] == "pending":
-                # Apply changes
-                try:
-                    self._deep_update(entry["personality"], p["changes"])
-                    p["status"] = "approved"
-                    p["approved_by"] = approver
-                    p["approved_at"] = self._now()
-                    entry["updated_at"] = self._now()
-                    self._save_db()
-                    return {"status": "ok", "applied": p}
-                except Exception as e:
-                    return {"status": "error", "error": f"apply_failed: {e}"}
+        p = self._find_pending(subchat_id, entry, proposal_id)
+        if p is not None:
+            # Apply changes
+            try:
+                self._deep_update(entry["personality"], p["changes"])
+                p["status"] = _STATUS_APPROVED
+                p["approved_by"] = approver
+                p["approved_at"] = entry["updated_at"] = self._now()
+                self._save_db()
+                return {"status": "ok", "applied": p}
+            except Exception as e:
+                return {"status": "error", "error": f"apply_failed: {e}"}
 
         return {"status": "error", "error": "proposal_not_found_or_not_pending"}
 
+    @_synchronized
     def reject_proposal(self, subchat_id: str, proposal_id: str, approver: str, reason: Optional[str] = None) -> Dict[str, Any]:
         entry = self._db.get(subchat_id)
         if not entry:
             return {"status": "error", "error": "subchat_not_found"}
 
-        for p in entry.get("pending_updates", []):
-            if p["proposal_id"] == proposal_id and p["status"] == "pending":
-                p["status"] = "rejected"
-                p["rejected_by"] = approver
-                p["rejected_at"] = self._now()
-                p["rejection_reason"] = reason or ""
-                entry["updated_at"] = self._now()
-                self._save_db()
-                return {"status": "ok", "rejected": p}
+        p = self._find_pending(subchat_id, entry, proposal_id)
+        if p is not None:
+            p["status"] = _STATUS_REJECTED
+            p["rejected_by"] = approver
+            p["rejected_at"] = entry["updated_at"] = self._now()
+            p["rejection_reason"] = reason or ""
+            self._save_db()
+            return {"status": "ok", "rejected": p}
 
         return {"status": "error", "error": "proposal_not_found_or_not_pending"}
 
@@ -262,19 +364,19 @@ class SubchatPersonalityManager:
         """
         if not isinstance(changes, dict):
             return changes
-        filtered = {}
-        for k, v in changes.items():
-            if k in PROTECTED_TRAITS:
-                # ignore protected trait change
-                continue
-            # If nested dict: filter recursively
-            if isinstance(v, dict):
-                filtered[k] = self._filter_protected_traits(v)
-            else:
-                filtered[k] = v
-        return filtered
+        protected = PROTECTED_TRAITS  # local lookup in the loop
+        # Common case: flat dict with nothing protected -> one C-level check
+        if protected.isdisjoint(changes) and not any(isinstance(v, dict) for v in changes.values()):
+            return dict(changes)
+        # Drop protected traits; filter nested dicts recursively
+        return {
+            k: self._filter_protected_traits(v) if isinstance(v, dict) else v
+            for k, v in changes.items()
+            if k not in protected
+        }
 
     # ---------- Enforcement ----------
+    @_synchronized
     def enforce_constraints(self, subchat_id: str) -> List[str]:
         """
         Validate and enforce constraints on a given subchat personality.
@@ -288,24 +390,31 @@ class SubchatPersonalityManager:
         p = entry.get("personality", {})
 
         # Ensure allowed top-level keys
-        for key in list(p.keys()):
-            if key not in ALLOWED_TOP_LEVEL_KEYS:
+        # one C-level set check in the common (all keys allowed) case; the
+        # removal pass keeps dict order so warnings stay deterministic
+        allowed = ALLOWED_TOP_LEVEL_KEYS
+        if not allowed.issuperset(p.keys()):
+            for key in [k for k in p if k not in allowed]:
                 warnings.append(f"removed_unknown_key:{key}")
-                p.pop(key, None)
+                del p[key]
 
         # Growth level clamp
-        growth = p.setdefault("growth", deepcopy(DEFAULT_PERSONALITY_TEMPLATE["growth"]))
+        if "growth" not in p:
+            p["growth"] = _clone_default_personality()["growth"]
+        growth = p["growth"]
         max_allowed = growth.get("max_level", DEFAULT_PERSONALITY_TEMPLATE["growth"]["max_level"])
         if growth.get("level", 0) > max_allowed:
             warnings.append("growth_level_clamped")
             growth["level"] = max_allowed
 
         # Tone / verbosity sanity checks
-        if p.get("tone") not in ("neutral", "friendly", "professional", "curt", "playful"):
+        tone = p.get("tone")
+        if not isinstance(tone, str) or tone not in _VALID_TONES:
             warnings.append("tone_reset")
             p["tone"] = DEFAULT_PERSONALITY_TEMPLATE["tone"]
 
-        if p.get("verbosity") not in ("terse", "balanced", "verbose"):
+        verbosity = p.get("verbosity")
+        if not isinstance(verbosity, str) or verbosity not in _VALID_VERBOSITY:
             warnings.append("verbosity_reset")
             p["verbosity"] = DEFAULT_PERSONALITY_TEMPLATE["verbosity"]
 
@@ -314,6 +423,7 @@ class SubchatPersonalityManager:
         return warnings
 
     # ---------- Import / Export ----------
+    @_synchronized
     def export_personality(self, subchat_id: str, path: Optional[Path] = None) -> Tuple[bool, Optional[str]]:
         entry = self._db.get(subchat_id)
         if not entry:
@@ -326,6 +436,7 @@ class SubchatPersonalityManager:
         except Exception as e:
             return False, str(e)
 
+    @_synchronized
     def import_personality(self, path: Path, overwrite: bool = False) -> Dict[str, Any]:
         try:
             with open(path, "r", encoding="utf-8") as f:
@@ -341,9 +452,13 @@ class SubchatPersonalityManager:
         data_personality = data.get("personality", {})
         data_personality = self._filter_protected_traits(data_personality)
         data["personality"] = data_personality
-        data.setdefault("created_at", self._now())
-        data["updated_at"] = self._now()
+        now = self._now()
+        data.setdefault("created_at", now)
+        data["updated_at"] = now
+        if sid in self._db:
+            self._unindex_proposals(self._db[sid])
         self._db[sid] = data
+        self._index_proposals(sid, data)
         self._save_db()
         return {"status": "ok", "id": sid}
 
@@ -370,6 +485,7 @@ class SubchatPersonalityManager:
         return {"status": "ok", "summary": desc}
 
     # ---------- Safe removal ----------
+    @_synchronized
     def remove_subchat(self, subchat_id: str, allow_delete_protected: bool = False) -> Dict[str, Any]:
         """
         Remove a subchat entry entirely. This does not remove parent.
@@ -381,6 +497,6 @@ class SubchatPersonalityManager:
         if not allow_delete_protected and subchat_id in PROTECTED_TRAITS:
             return {"status": "error", "error": "protected_subchat"}
 
-        self._db.pop(subchat_id)
+        self._unindex_proposals(self._db.pop(subchat_id))
         self._save_db()
         return {"status": "ok", "removed": subchat_id}
\ No newline at end of file
@@ -14,9 +14,9 @@ Policy schema (example):
       "owner": "user:amoki",
       "private": true,
       "password_protected": true,
-      "password_hash": "<sha256>",
+      "password_hash": "b2$<blake2b-256>",   # legacy: bare "<sha256>" hex
       "security_questions": [
-          {"q": "mother_maiden", "answer_hash": "<sha256>"},
+          {"q": "mother_maiden", "answer_hash": "b2$<blake2b-256>"},
           ...
       ],
       "allowed_agents": ["MobileDetailAgent"],
@@ -36,13 +36,16 @@ Usage:
   evaluator.is_action_allowed(subchat_id, actor, action, context={})
 """
 
-import os
-import json
 import hashlib
+import hmac
 import logging
+import threading
 from pathlib import Path
 from typing import Any, Dict, Optional, List
 
+from core._json import dumps, loads as _loads
+from core._persist import DebouncedWriter, atomic_write as _atomic_write, synchronized as _synchronized
+
 LOG = logging.getLogger("subchat_policy")
 LOG.setLevel(logging.INFO)
 if not LOG.handlers:
@@ -55,38 +58,170 @@ CORE_DIR = Path(__file__).resolve().parents[1]
 POLICY_DIR = CORE_DIR / "policies"
 POLICY_FILE = POLICY_DIR / "subchat_policies.json"
 
+# Actor string prefixes (see PolicyEvaluator._actor_type)
+_USER_PREFIX = "user:"
+_AGENT_PREFIX = "agent:"
+_USER_LEN = len(_USER_PREFIX)
+_AGENT_LEN = len(_AGENT_PREFIX)
+
+
+# Membership lists held as sets in memory (O(1) `in`), persisted as lists.
+_SET_FIELDS = ("allowed_agents", "allowed_users")
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (set, frozenset)):
+        try:
+            return sorted(obj)
+        except TypeError:
+            return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize the policy file (indented; allow-list sets become lists)."""
+    return dumps(obj, pretty=True, default=_json_default)
+
+
+# Template for ensure_default_policy; id/name/owner/allowed_users filled per call.
+_DEFAULT_POLICY_TEMPLATE: Dict[str, Any] = {
+    "id": None,
+    "name": None,
+    "owner": None,
+    "private": True,
+    "password_protected": False,
+    "password_hash": None,
+    "security_questions": [],
+    "allowed_agents": [],
+    "allowed_users": [],
+    "allow_agent_to_agent": False,
+    "rag_read": "own",
+    "rag_write": False,
+    "max_concurrent_workers": 1,
+    "notes": ""
+}
+_DEFAULT_POLICY_BYTES = _dumps(_DEFAULT_POLICY_TEMPLATE)
+
+
+def _clone_default_policy() -> Dict[str, Any]:
+    """Fresh copy of the default policy: one decode of the pre-encoded template."""
+    return _loads(_DEFAULT_POLICY_BYTES)
+
 
+def _intern_sets(policy: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a policy's allow-lists to sets in place (left as-is if unhashable)."""
+    for key in _SET_FIELDS:
+        value = policy.get(key)
+        if isinstance(value, (list, tuple)):
+            try:
+                policy[key] = set(value)
+            except TypeError:
+                pass
+    return policy
+
+
+_HASH_PREFIX = "b2$"
+_LEGACY_PREFIX = "sha256$"
+
+
+# Deliberately uncached: a cache keyed on the secret would keep plaintext
+# passwords/answers in process memory, and BLAKE2b of a short string is cheap.
 def _hash_secret(secret: str) -> str:
-    """Return a stable SHA256 hex digest for secrets (passwords / answers)."""
+    """Return a stable, versioned BLAKE2b-256 digest for secrets (passwords / answers)."""
+    return _HASH_PREFIX + hashlib.blake2b(secret.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def _legacy_hash_secret(secret: str) -> str:
+    """SHA256 hex digest, as stored before versioned hashes."""
     return hashlib.sha256(secret.encode("utf-8")).hexdigest()
 
 
+def _secret_matches(secret: str, stored_hash: Any) -> bool:
+    """Constant-time check of `secret` against a stored digest (current or legacy format)."""
+    if not isinstance(stored_hash, str):
+        return False
+    if stored_hash.startswith(_HASH_PREFIX):
+        expected = _hash_secret(secret)
+    else:
+        if stored_hash.startswith(_LEGACY_PREFIX):
+            stored_hash = stored_hash[len(_LEGACY_PREFIX):]
+        expected = _legacy_hash_secret(secret)
+    return hmac.compare_digest(expected.encode("utf-8"), stored_hash.encode("utf-8"))
+
+
 class PolicyStore:
-    """Persistence layer for subchat policies."""
+    """
+    Persistence layer for subchat policies.
+
+    Policies returned by get_policy / list_policies / ensure_default_policy are
+    the stored dicts, whose allow-lists ("allowed_agents", "allowed_users")
+    are sets: use .add()/.discard(), not .append(). They are written to disk
+    as sorted lists.
+    """
 
-    def __init__(self, path: Optional[Path] = None):
+    def __init__(self, path: Optional[Path] = None, save_delay: float = 0.25):
         self.path = path or POLICY_FILE
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._policies: Dict[str, Dict[str, Any]] = {}
-        self.load()
-
+        # Loaded lazily on first use of self._policies (property below).
+        self._policies_data: Optional[Dict[str, Dict[str, Any]]] = None
+        # Guards the in-memory policies (mutations and lazy load). Lookups stay
+        # lock-free. Lock order: writer's write lock -> _write_lock -> _lock -> writer's state lock.
+        self._lock = threading.RLock()
+        # Serializes snapshot + file write so an older snapshot never lands last.
+        self._write_lock = threading.Lock()
+        # save() only marks the store dirty; the writer writes once per burst.
+        self._writer = DebouncedWriter(save_delay, self._save_now)
+
+    @property
+    def _policies(self) -> Dict[str, Dict[str, Any]]:
+        policies = self._policies_data
+        if policies is None:
+            with self._lock:
+                if self._policies_data is None:
+                    self.load()
+                policies = self._policies_data
+        return policies
+
+    @_policies.setter
+    def _policies(self, value: Dict[str, Dict[str, Any]]) -> None:
+        self._policies_data = value
+
+    @_synchronized
     def load(self) -> None:
         if self.path.exists():
             try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    self._policies = json.load(f)
+                with open(self.path, "rb") as f:
+                    self._policies = _loads(f.read())
+                for policy in self._policies.values():
+                    if isinstance(policy, dict):
+                        _intern_sets(policy)
                 LOG.info("Loaded subchat policies from disk.")
             except Exception as e:
                 LOG.error("Failed to load policies: %s", e)
                 self._policies = {}
         else:
             self._policies = {}
-            self.save()  # create file
+            # create file; written directly since _save_now would take _write_lock under _lock
+            try:
+                _atomic_write(self.path, _dumps(self._policies))
+            except Exception as e:
+                LOG.error("Failed to save policies: %s", e)
 
     def save(self) -> None:
+        """Schedule a debounced write; call flush() to write immediately."""
+        self._writer.schedule()
+
+    def flush(self) -> None:
+        """Write pending policy changes to disk now."""
+        self._writer.flush()
+
+    def _save_now(self) -> None:
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self._policies, f, indent=2, ensure_ascii=False)
+            with self._write_lock:
+                # snapshot under the store lock, write to disk outside it
+                with self._lock:
+                    content = _dumps(self._policies)
+                _atomic_write(self.path, content)
             LOG.info("Saved subchat policies to disk.")
         except Exception as e:
             LOG.error("Failed to save policies: %s", e)
@@ -97,12 +232,14 @@ class PolicyStore:
     def list_policies(self) -> List[Dict[str, Any]]:
         return list(self._policies.values())
 
+    @_synchronized
     def set_policy(self, subchat_id: str, policy: Dict[str, Any]) -> None:
-        policy = dict(policy)
+        policy = _intern_sets(dict(policy))
         policy["id"] = subchat_id
         self._policies[subchat_id] = policy
         self.save()
 
+    @_synchronized
     def remove_policy(self, subchat_id: str) -> bool:
         if subchat_id in self._policies:
             del self._policies[subchat_id]
@@ -110,29 +247,19 @@ class PolicyStore:
             return True
         return False
 
+    @_synchronized
     def ensure_default_policy(self, subchat_id: str, owner: str) -> Dict[str, Any]:
         """Create minimal default policy if missing and return it."""
         pol = self.get_policy(subchat_id)
         if pol:
             return pol
-        default = {
-            "id": subchat_id,
-            "name": subchat_id,
-            "owner": owner,
-            "private": True,
-            "password_protected": False,
-            "password_hash": None,
-            "security_questions": [],
-            "allowed_agents": [],
-            "allowed_users": [owner],
-            "allow_agent_to_agent": False,
-            "rag_read": "own",
-            "rag_write": False,
-            "max_concurrent_workers": 1,
-            "notes": ""
-        }
+        default = _clone_default_policy()
+        default["id"] = default["name"] = subchat_id
+        default["owner"] = owner
+        default["allowed_users"] = [owner]
         self.set_policy(subchat_id, default)
-        return default
+        # the stored copy, so the first call returns the same shape (sets) as later ones
+        return self.get_policy(subchat_id)
 
 
 class PolicyEvaluator:
@@ -140,6 +267,16 @@ class PolicyEvaluator:
 
     def __init__(self, store: PolicyStore):
         self.store = store
+        # action -> handler(policy, actor, actor_type, actor_name, context)
+        self._handlers = {
+            "join": self._eval_join,
+            "read": self._eval_read,
+            "query_rag": self._eval_read,
+            "write": self._eval_write,
+            "spawn_worker": self._eval_spawn,
+            "agent_to_agent": self._eval_agent_to_agent,
+            "modify_policy": self._eval_modify_policy,
+        }
 
     # -- Helpers --
     def _get_policy(self, subchat_id: str) -> Optional[Dict[str, Any]]:
@@ -154,11 +291,19 @@ class PolicyEvaluator:
           - user:<username>
           - agent:<AgentName>
         """
-        if actor.startswith("user:"):
-            return "user"
-        if actor.startswith("agent:"):
-            return "agent"
-        return "unknown"
+        return self._parse_actor(actor)[0]
+
+    @staticmethod
+    def _parse_actor(actor: str):
+        """(actor_type, name) in one pass; dispatches on the first character."""
+        if not actor:
+            return "unknown", ""
+        c = actor[0]
+        if c == "u" and actor[:_USER_LEN] == _USER_PREFIX:
+            return "user", actor[_USER_LEN:]
+        if c == "a" and actor[:_AGENT_LEN] == _AGENT_PREFIX:
+            return "agent", actor[_AGENT_LEN:]
+        return "unknown", ""
 
     # -- Public API --
     def is_action_allowed(self, subchat_id: str, actor: str, action: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -173,116 +318,116 @@ class PolicyEvaluator:
             LOG.info("No policy for subchat '%s' — denying by default.", subchat_id)
             return {"allowed": False, "reason": "no_policy"}
 
-        actor_type = self._actor_type(actor)
+        actor_type, actor_name = self._parse_actor(actor)
 
         # Owners may do everything except bypass system-level protections
         if self._is_owner(policy, actor):
             return {"allowed": True, "reason": "owner"}
 
+        handler = self._handlers.get(action)
+        if handler is None:
+            # Default deny
+            return {"allowed": False, "reason": "action_not_recognized"}
+        return handler(policy, actor, actor_type, actor_name, context)
+
+    # -- Per-action evaluators (owner already handled) --
+    def _eval_join(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
         # Handle password-protected join
-        if action == "join":
-            if policy.get("password_protected"):
-                supplied = context.get("password")
-                if not supplied:
-                    return {"allowed": False, "reason": "password_required"}
-                if _hash_secret(supplied) != policy.get("password_hash"):
-                    return {"allowed": False, "reason": "invalid_password"}
-            # If not password-protected, check allowed_users / allowed_agents
-            if actor_type == "user":
-                if actor in policy.get("allowed_users", []):
-                    return {"allowed": True, "reason": "user_allowed"}
-                else:
-                    return {"allowed": False, "reason": "user_not_allowed"}
-            elif actor_type == "agent":
-                if actor.split(":", 1)[1] in policy.get("allowed_agents", []):
-                    return {"allowed": True, "reason": "agent_allowed"}
-                else:
-                    return {"allowed": False, "reason": "agent_not_allowed"}
-            else:
-                return {"allowed": False, "reason": "unknown_actor"}
-
-        # Read/write/query actions
-        if action in ("read", "query_rag"):
-            rag_policy = policy.get("rag_read", "none")
-            # Interpret rag_read values:
-            # "none" -> no RAG access, "own" -> only subchat's own RAG,
-            # "global" -> system global RAG allowed, "all" -> full RAG access
-            if rag_policy == "none":
-                return {"allowed": False, "reason": "rag_disabled"}
-            if actor_type == "agent":
-                # agents must be explicitly allowed unless rag_read == all
-                if rag_policy == "all":
-                    return {"allowed": True, "reason": "rag_all"}
-                if rag_policy == "global":
-                    return {"allowed": True, "reason": "rag_global"}
-                if rag_policy == "own":
-                    # agents may read own RAG only if agent belongs to subchat
-                    agent_name = actor.split(":", 1)[1]
-                    if agent_name in policy.get("allowed_agents", []):
-                        return {"allowed": True, "reason": "rag_own_agent"}
-                    return {"allowed": False, "reason": "rag_own_only"}
-            else:
-                # user access: check allowed_users
-                if actor in policy.get("allowed_users", []):
-                    return {"allowed": True, "reason": "user_rag_allowed"}
-                return {"allowed": False, "reason": "user_not_allowed"}
-
-        if action == "write":
-            if policy.get("rag_write"):
-                actor_allowed = (actor_type == "user" and actor in policy.get("allowed_users", [])) or (actor_type == "agent" and actor.split(":", 1)[1] in policy.get("allowed_agents", []))
-                if actor_allowed:
-                    return {"allowed": True, "reason": "write_allowed"}
-                return {"allowed": False, "reason": "write_not_allowed"}
+        if policy.get("password_protected"):
+            supplied = context.get("password")
+            if not supplied:
+                return {"allowed": False, "reason": "password_required"}
+            if not _secret_matches(supplied, policy.get("password_hash")):
+                return {"allowed": False, "reason": "invalid_password"}
+        # If not password-protected, check allowed_users / allowed_agents
+        if actor_type == "user":
+            if actor in policy.get("allowed_users", []):
+                return {"allowed": True, "reason": "user_allowed"}
+            return {"allowed": False, "reason": "user_not_allowed"}
+        if actor_type == "agent":
+            if actor_name in policy.get("allowed_agents", []):
+                return {"allowed": True, "reason": "agent_allowed"}
+            return {"allowed": False, "reason": "agent_not_allowed"}
+        return {"allowed": False, "reason": "unknown_actor"}
+
+    def _eval_read(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
+        rag_policy = policy.get("rag_read", "none")
+        # Interpret rag_read values:
+        # "none" -> no RAG access, "own" -> only subchat's own RAG,
+        # "global" -> system global RAG allowed, "all" -> full RAG access
+        if rag_policy == "none":
+            return {"allowed": False, "reason": "rag_disabled"}
+        if actor_type == "agent":
+            # agents must be explicitly allowed unless rag_read == all
+            if rag_policy == "all":
+                return {"allowed": True, "reason": "rag_all"}
+            if rag_policy == "global":
+                return {"allowed": True, "reason": "rag_global"}
+            if rag_policy == "own":
+                # agents may read own RAG only if agent belongs to subchat
+                if actor_name in policy.get("allowed_agents", []):
+                    return {"allowed": True, "reason": "rag_own_agent"}
+                return {"allowed": False, "reason": "rag_own_only"}
+            return {"allowed": False, "reason": "action_not_recognized"}
+        # user access: check allowed_users
+        if actor in policy.get("allowed_users", []):
+            return {"allowed": True, "reason": "user_rag_allowed"}
+        return {"allowed": False, "reason": "user_not_allowed"}
+
+    def _eval_write(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
+        if not policy.get("rag_write"):
             return {"allowed": False, "reason": "write_disabled"}
-
-        if action == "spawn_worker":
-            # Enforce max_concurrent_workers (context may provide current count)
-            max_workers = int(policy.get("max_concurrent_workers", 1) or 1)
-            current = int(context.get("current_workers", 0))
-            if current >= max_workers:
-                return {"allowed": False, "reason": "max_workers_exceeded"}
-            # only allow agents (or users with permission) to spawn workers
-            if actor_type == "agent":
-                if actor.split(":", 1)[1] in policy.get("allowed_agents", []):
-                    return {"allowed": True, "reason": "agent_allowed_spawn"}
-                return {"allowed": False, "reason": "agent_not_allowed_spawn"}
-            if actor_type == "user" and actor in policy.get("allowed_users", []):
-                return {"allowed": True, "reason": "user_allowed_spawn"}
-            return {"allowed": False, "reason": "not_permitted_to_spawn"}
-
-        if action == "agent_to_agent":
-            # Only allow if policy explicitly enables agent->agent and both agents are permitted
-            if not policy.get("allow_agent_to_agent", False):
-                return {"allowed": False, "reason": "agent_to_agent_disabled"}
-            src = context.get("source_agent")
-            dst = context.get("target_agent")
-            if not src or not dst:
-                return {"allowed": False, "reason": "missing_agents"}
-            allowed_agents = policy.get("allowed_agents", [])
-            if src not in allowed_agents or dst not in allowed_agents:
-                return {"allowed": False, "reason": "agent_not_in_allowed_list"}
-            return {"allowed": True, "reason": "agent_to_agent_allowed"}
-
-        if action == "modify_policy":
-            # Only owner may modify; administrators may be added in allowed_users
-            return {"allowed": False, "reason": "only_owner_can_modify"}
-
-        # Default deny
-        return {"allowed": False, "reason": "action_not_recognized"}
+        actor_allowed = (actor_type == "user" and actor in policy.get("allowed_users", [])) or (
+            actor_type == "agent" and actor_name in policy.get("allowed_agents", [])
+        )
+        if actor_allowed:
+            return {"allowed": True, "reason": "write_allowed"}
+        return {"allowed": False, "reason": "write_not_allowed"}
+
+    def _eval_spawn(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
+        # Enforce max_concurrent_workers (context may provide current count)
+        max_workers = int(policy.get("max_concurrent_workers", 1) or 1)
+        current = int(context.get("current_workers", 0))
+        if current >= max_workers:
+            return {"allowed": False, "reason": "max_workers_exceeded"}
+        # only allow agents (or users with permission) to spawn workers
+        if actor_type == "agent":
+            if actor_name in policy.get("allowed_agents", []):
+                return {"allowed": True, "reason": "agent_allowed_spawn"}
+            return {"allowed": False, "reason": "agent_not_allowed_spawn"}
+        if actor_type == "user" and actor in policy.get("allowed_users", []):
+            return {"allowed": True, "reason": "user_allowed_spawn"}
+        return {"allowed": False, "reason": "not_permitted_to_spawn"}
+
+    def _eval_agent_to_agent(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
+        # Only allow if policy explicitly enables agent->agent and both agents are permitted
+        if not policy.get("allow_agent_to_agent", False):
+            return {"allowed": False, "reason": "agent_to_agent_disabled"}
+        src = context.get("source_agent")
+        dst = context.get("target_agent")
+        if not src or not dst:
+            return {"allowed": False, "reason": "missing_agents"}
+        allowed_agents = policy.get("allowed_agents", [])
+        if src not in allowed_agents or dst not in allowed_agents:
+            return {"allowed": False, "reason": "agent_not_in_allowed_list"}
+        return {"allowed": True, "reason": "agent_to_agent_allowed"}
+
+    def _eval_modify_policy(self, policy, actor, actor_type, actor_name, context) -> Dict[str, Any]:
+        # Only owner may modify; administrators may be added in allowed_users
+        return {"allowed": False, "reason": "only_owner_can_modify"}
 
     # -- Utilities for policy management --
     def set_password(self, subchat_id: str, password: Optional[str]) -> bool:
-        policy = self._get_policy(subchat_id)
-        if policy is None:
-            LOG.error("Cannot set password; policy not found: %s", subchat_id)
-            return False
-        if password is None:
-            policy["password_protected"] = False
-            policy["password_hash"] = None
-        else:
-            policy["password_protected"] = True
-            policy["password_hash"] = _hash_secret(password)
-        self.store.set_policy(subchat_id, policy)
+        password_hash = None if password is None else _hash_secret(password)
+        # read-modify-write under the store lock so concurrent updates don't interleave
+        with self.store._lock:
+            policy = self._get_policy(subchat_id)
+            if policy is None:
+                LOG.error("Cannot set password; policy not found: %s", subchat_id)
+                return False
+            policy["password_protected"] = password_hash is not None
+            policy["password_hash"] = password_hash
+            self.store.set_policy(subchat_id, policy)
         LOG.info("Password updated for subchat '%s' (protected=%s).", subchat_id, policy["password_protected"])
         return True
 
@@ -292,17 +437,19 @@ class PolicyEvaluator:
             return False
         for q in policy.get("security_questions", []):
             if q.get("q") == question_key:
-                return _hash_secret(answer) == q.get("answer_hash")
+                return _secret_matches(answer, q.get("answer_hash"))
         return False
 
     def add_security_question(self, subchat_id: str, question_key: str, answer: str) -> bool:
-        policy = self._get_policy(subchat_id)
-        if not policy:
-            return False
-        policy.setdefault("security_questions", [])
-        policy["security_questions"].append({
-            "q": question_key,
-            "answer_hash": _hash_secret(answer)
-        })
-        self.store.set_policy(subchat_id, policy)
+        answer_hash = _hash_secret(answer)
+        with self.store._lock:
+            policy = self._get_policy(subchat_id)
+            if not policy:
+                return False
+            policy.setdefault("security_questions", [])
+            policy["security_questions"].append({
+                "q": question_key,
+                "answer_hash": answer_hash
+            })
+            self.store.set_policy(subchat_id, policy)
         return True
\ No newline at end of file
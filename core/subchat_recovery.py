@@ -1,8 +1,82 @@
 # /core/subchat_recovery.py
 
-import json
+import hashlib
+import logging
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable
+
+from core._json import dumps as _dumps, loads as _loads
+
+logger = logging.getLogger("subchat_recovery")
+
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None
+
+
+def _pack(obj: Any) -> bytes:
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+# Snapshot formats by file extension, preferred first. Snapshots are only read
+# back by this module, so msgpack is used when installed; JSON stays readable
+# so existing snapshots (and installs without msgpack) keep working.
+_SERIALIZERS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {}
+if msgpack is not None:
+    _SERIALIZERS[".msgpack"] = (_pack, _unpack)
+_SERIALIZERS[".json"] = (_dumps, _loads)
+_SNAPSHOT_EXT = next(iter(_SERIALIZERS))
+
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """
+    Atomically replace `path` with `data`: the payload goes to a sibling .tmp
+    file with raw os.write calls (normally just one), is fsynced, then
+    renamed over the target so a crash never leaves a half-written snapshot.
+    """
+    tmp = path + ".tmp"
+    fd = os.open(tmp, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _ensure_dir(path: str) -> None:
+    """
+    One mkdir syscall in the common case (makedirs stats every level first);
+    parents are only created when missing. Not cached across instances, so a
+    folder removed in the meantime is recreated.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file in one unbuffered, size-hinted read."""
+    with open(path, "rb", buffering=0) as f:
+        return f.readall()
+
 
 class SubChatRecovery:
     """
@@ -12,10 +86,27 @@ class SubChatRecovery:
 
     def __init__(self, recovery_folder: str = "System/subchat_recovery"):
         self.recovery_folder = recovery_folder
-        os.makedirs(self.recovery_folder, exist_ok=True)
+        _ensure_dir(self.recovery_folder)
+        # subchat_id -> (digest of the last payload written, (mtime_ns, size) of
+        # the file right after that write); identical rewrites are skipped only
+        # while the file on disk is still the one we wrote
+        self._last_hash: Dict[str, Tuple[bytes, Tuple[int, int]]] = {}
+        # subchat_id -> ((ext, mtime_ns, size), raw snapshot bytes); re-read only
+        # when the file changes. Bytes, not the parsed state, so every load
+        # decodes a private copy that callers are free to mutate.
+        self._cache: Dict[str, Tuple[Tuple[str, int, int], bytes]] = {}
 
-    def get_recovery_file(self, subchat_id: str) -> str:
-        return os.path.join(self.recovery_folder, f"{subchat_id}_recovery.json")
+    def get_recovery_file(self, subchat_id: str, ext: str = _SNAPSHOT_EXT) -> str:
+        return os.path.join(self.recovery_folder, f"{subchat_id}_recovery{ext}")
+
+    def _remove_other_formats(self, subchat_id: str) -> None:
+        """Drop snapshots left in a non-preferred format so they can't go stale."""
+        for ext in _SERIALIZERS:
+            if ext != _SNAPSHOT_EXT:
+                try:
+                    os.remove(self.get_recovery_file(subchat_id, ext))
+                except FileNotFoundError:
+                    pass
 
     def save_recovery_state(self, subchat_id: str, state: Dict[str, Any]) -> None:
         """
@@ -23,27 +114,62 @@ class SubChatRecovery:
         This gets updated after every major action by subchat_state.py or subchat_engine.py.
         """
         try:
+            payload = _SERIALIZERS[_SNAPSHOT_EXT][0](state)
+            digest = _digest(payload)
             filepath = self.get_recovery_file(subchat_id)
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(state, f, indent=4)
+            last = self._last_hash.get(subchat_id)
+            if last is not None and last[0] == digest:
+                try:
+                    st = os.stat(filepath)
+                    if (st.st_mtime_ns, st.st_size) == last[1]:
+                        return
+                except FileNotFoundError:
+                    pass
+            self._cache.pop(subchat_id, None)
+            try:
+                _write_bytes(filepath, payload)
+            except FileNotFoundError:
+                # recovery folder was removed underneath us: recreate and retry
+                _ensure_dir(self.recovery_folder)
+                _write_bytes(filepath, payload)
+            st = os.stat(filepath)
+            self._last_hash[subchat_id] = (digest, (st.st_mtime_ns, st.st_size))
+            if last is None:
+                self._remove_other_formats(subchat_id)
         except Exception as e:
-            print(f"[RECOVERY ERROR] Failed saving state for {subchat_id}: {e}")
+            logger.warning("Failed saving state for %s: %s", subchat_id, e)
 
     def load_recovery_state(self, subchat_id: str) -> Optional[Dict[str, Any]]:
         """
         Tries to load a SubChat recovery snapshot.
         Returns None if not found or unreadable.
+
+        The snapshot bytes are cached until the file changes on disk; each call
+        returns a freshly decoded dict owned by the caller.
         """
         try:
-            filepath = self.get_recovery_file(subchat_id)
-            if not os.path.exists(filepath):
+            for ext, (_, decode) in _SERIALIZERS.items():
+                filepath = self.get_recovery_file(subchat_id, ext)
+                try:
+                    st = os.stat(filepath)
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                self._cache.pop(subchat_id, None)
                 return None
 
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data
+            key = (ext, st.st_mtime_ns, st.st_size)
+            cached = self._cache.get(subchat_id)
+            if cached is not None and cached[0] == key:
+                return decode(cached[1])
+
+            raw = _read_bytes(filepath)
+            data = decode(raw)
+            self._cache[subchat_id] = (key, raw)
+            return data
         except Exception as e:
-            print(f"[RECOVERY ERROR] Failed loading state for {subchat_id}: {e}")
+            logger.warning("Failed loading state for %s: %s", subchat_id, e)
             return None
 
     def attempt_recovery(self, subchat_id: str) -> Optional[Dict[str, Any]]:
@@ -54,19 +180,22 @@ class SubChatRecovery:
         """
         state = self.load_recovery_state(subchat_id)
         if state:
-            print(f"[RECOVERY] SubChat '{subchat_id}' restored from recovery snapshot.")
+            logger.info("SubChat '%s' restored from recovery snapshot.", subchat_id)
             return state
 
-        print(f"[RECOVERY] No recovery data for SubChat '{subchat_id}'. Fresh start required.")
+        logger.info("No recovery data for SubChat '%s'. Fresh start required.", subchat_id)
         return None
 
     def delete_recovery_state(self, subchat_id: str) -> None:
         """
         Deletes a recovery snapshot after a SubChat successfully stabilizes.
         """
+        self._last_hash.pop(subchat_id, None)
+        self._cache.pop(subchat_id, None)
         try:
-            filepath = self.get_recovery_file(subchat_id)
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            for ext in _SERIALIZERS:
+                filepath = self.get_recovery_file(subchat_id, ext)
+                if os.path.exists(filepath):
+                    os.remove(filepath)
         except Exception as e:
-            print(f"[RECOVERY ERROR] Failed deleting recovery state for {subchat_id}: {e}")
\ No newline at end of file
+            logger.warning("Failed deleting recovery state for %s: %s", subchat_id, e)
\ No newline at end of file
@@ -1,5 +1,18 @@
 # /core/subchat_renderer.py
 
+# Bound on cached (sender, day) -> group_key strings; cleared when exceeded.
+_GROUP_KEY_CACHE_MAX = 4096
+
+
+def _compile_palette(theme: dict) -> tuple:
+    """
+    (sender -> color, system color, error color) for a theme, built from its
+    "<sender>_color" keys so rendering never formats or probes theme keys.
+    """
+    colors = {key[:-6]: value for key, value in theme.items() if key.endswith("_color")}
+    return colors, theme["system_color"], theme["error_color"]
+
+
 class SubChatRenderer:
     """
     Converts processed SubChat messages into UI-ready render data.
@@ -17,10 +30,15 @@ class SubChatRenderer:
             }
         }
         self.active_theme = "default"
+        self._palette = _compile_palette(self.themes[self.active_theme])
+        # (sender, date prefix) -> group_key, so repeated pairs reuse one string
+        self._group_key_cache = {}
 
     def set_theme(self, theme_name: str):
+        """Activate a theme (call again after editing a theme's colors to pick them up)."""
         if theme_name in self.themes:
             self.active_theme = theme_name
+            self._palette = _compile_palette(self.themes[theme_name])
 
     def render(self, message: dict) -> dict:
         """
@@ -35,28 +53,37 @@ class SubChatRenderer:
             "error": False
         }
         """
-        theme = self.themes[self.active_theme]
-        sender = message.get("sender", "system")
-
-        color = (
-            theme["error_color"] if message.get("error") else
-            theme.get(f"{sender}_color", theme["system_color"])
-        )
-
-        return {
-            "text": message.get("text", ""),
-            "timestamp": message.get("timestamp", ""),
-            "sender": sender,
-            "color": color,
-            "channel": message.get("channel", "unknown"),
-            "group_key": self._group_key(sender, message.get("timestamp"))
-        }
+        return self._render(message, *self._palette)
 
     def batch_render(self, messages: list) -> list:
         """
         Render a list of normalized messages.
         """
-        return [self.render(m) for m in messages]
+        colors, system_color, error_color = self._palette
+        render = self._render
+        return [render(m, colors, system_color, error_color) for m in messages]
+
+    def _render(self, message: dict, colors: dict, system_color: str, error_color: str) -> dict:
+        get = message.get
+        sender = get("sender", "system")
+
+        # Inlined _group_key with a cache: consecutive messages from one
+        # sender on one day share a single key string.
+        cache_key = (sender, get("timestamp")[:10])
+        group_key = self._group_key_cache.get(cache_key)
+        if group_key is None:
+            if len(self._group_key_cache) >= _GROUP_KEY_CACHE_MAX:
+                self._group_key_cache.clear()
+            group_key = self._group_key_cache[cache_key] = f"{sender}-{cache_key[1]}"
+
+        return {
+            "text": get("text", ""),
+            "timestamp": get("timestamp", ""),
+            "sender": sender,
+            "color": error_color if get("error") else colors.get(sender, system_color),
+            "channel": get("channel", "unknown"),
+            "group_key": group_key
+        }
 
     def _group_key(self, sender: str, timestamp: str) -> str:
         """
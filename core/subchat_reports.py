@@ -11,23 +11,75 @@ It only reads from:
 - subchat_state.py
 
 All reporting is read-only and cannot modify any system data.
+build_*_report methods return plain dicts. The matching *_view methods
+return lazy read-only mappings instead: each collaborator is only queried
+when its field is first read (for UIs that render a few fields).
 """
 
-from typing import Dict, Any, List
+import time
+from collections.abc import Mapping
+from typing import Dict, Any, List, Callable, Iterator, Optional, Tuple
+
+
+class _LazyReport(Mapping):
+    """
+    Read-only report whose fields are fetched on first access and memoized.
+    `fixed` holds plain values; `loaders` maps the remaining keys to
+    zero-argument callables. Key order is fixed fields first, then loaders.
+    """
+
+    __slots__ = ("_values", "_loaders", "_keys")
+
+    def __init__(self, fixed: Dict[str, Any], loaders: Dict[str, Callable[[], Any]]):
+        self._values = dict(fixed)
+        self._loaders = loaders
+        self._keys = (*fixed, *loaders)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        value = self._values[key] = self._loaders[key]()
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize every field (e.g. for JSON export)."""
+        return {key: self[key] for key in self._keys}
+
+    def __repr__(self) -> str:
+        return f"_LazyReport({self.to_dict()!r})"
 
 
 class SubchatReports:
-    def __init__(self, audit_ref, monitor_ref, diagnostics_ref, state_ref):
+    def __init__(self, audit_ref, monitor_ref, diagnostics_ref, state_ref, overview_ttl: float = 1.0):
         """
         audit_ref: instance of SubchatAudit
         monitor_ref: instance of SubchatMonitor
         diagnostics_ref: instance of SubchatDiagnostics
         state_ref: instance of SubchatState
+        overview_ttl: seconds a per-subchat overview is reused (0 disables caching)
         """
         self.audit = audit_ref
         self.monitor = monitor_ref
         self.diagnostics = diagnostics_ref
         self.state = state_ref
+        self.overview_ttl = overview_ttl
+        # subchat_id -> (monotonic build time, overview report)
+        self._overview_cache: Dict[str, Tuple[float, Mapping]] = {}
+
+    def invalidate(self, subchat_id: Optional[str] = None) -> None:
+        """Drop cached overviews for one subchat (e.g. on a state transition) or all."""
+        if subchat_id is None:
+            self._overview_cache.clear()
+        else:
+            self._overview_cache.pop(subchat_id, None)
 
     # ------------------------------------------------------------
     # High-level Report Builders
@@ -35,39 +87,56 @@ class SubchatReports:
 
     def build_overview_report(self) -> Dict[str, Any]:
         """Generate a full system summary."""
-        return {
-            "active_subchats": self.monitor.list_active_subchats(),
-            "recent_audit_events": self.audit.get_recent_events(limit=15),
-            "system_health": self.diagnostics.get_system_health(),
-            "lifecycle_counts": self.state.get_lifecycle_statistics()
-        }
+        return self.overview_report_view().to_dict()
 
     def build_audit_report(self, subchat_id: str) -> Dict[str, Any]:
         """Generate an audit-focused report for a specific subchat."""
-        return {
-            "subchat_id": subchat_id,
-            "audit_history": self.audit.get_history(subchat_id),
-            "violation_count": self.audit.count_violations(subchat_id),
-            "last_event": self.audit.get_last_event(subchat_id)
-        }
+        return self.audit_report_view(subchat_id).to_dict()
 
     def build_health_report(self, subchat_id: str) -> Dict[str, Any]:
         """Generate a diagnostics-focused report."""
-        return {
-            "subchat_id": subchat_id,
-            "status": self.diagnostics.get_subchat_status(subchat_id),
-            "issues": self.diagnostics.list_subchat_issues(subchat_id),
-            "performance_metrics": self.monitor.get_subchat_metrics(subchat_id)
-        }
+        return self.health_report_view(subchat_id).to_dict()
 
     def build_activity_report(self, subchat_id: str) -> Dict[str, Any]:
         """Generate an activity-focused report."""
-        return {
-            "subchat_id": subchat_id,
-            "messages_sent": self.monitor.count_messages(subchat_id),
-            "runtime_seconds": self.state.get_runtime(subchat_id),
-            "transitions": self.state.get_state_transitions(subchat_id)
-        }
+        return self.activity_report_view(subchat_id).to_dict()
+
+    # ------------------------------------------------------------
+    # Lazy Views (fields fetched on first read)
+    # ------------------------------------------------------------
+
+    def overview_report_view(self) -> Mapping:
+        """Lazy view of build_overview_report."""
+        return _LazyReport({}, {
+            "active_subchats": self.monitor.list_active_subchats,
+            "recent_audit_events": lambda: self.audit.get_recent_events(limit=15),
+            "system_health": self.diagnostics.get_system_health,
+            "lifecycle_counts": self.state.get_lifecycle_statistics
+        })
+
+    def audit_report_view(self, subchat_id: str) -> Mapping:
+        """Lazy view of build_audit_report."""
+        return _LazyReport({"subchat_id": subchat_id}, {
+            "audit_history": lambda: self.audit.get_history(subchat_id),
+            "violation_count": lambda: self.audit.count_violations(subchat_id),
+            "last_event": lambda: self.audit.get_last_event(subchat_id)
+        })
+
+    def health_report_view(self, subchat_id: str) -> Mapping:
+        """Lazy view of build_health_report."""
+        return _LazyReport({"subchat_id": subchat_id}, {
+            "status": lambda: self.diagnostics.get_subchat_status(subchat_id),
+            "issues": lambda: self.diagnostics.list_subchat_issues(subchat_id),
+            "performance_metrics": lambda: self.monitor.get_subchat_metrics(subchat_id)
+        })
+
+    def activity_report_view(self, subchat_id: str) -> Mapping:
+        """Lazy view of build_activity_report."""
+        return _LazyReport({"subchat_id": subchat_id}, {
+            "messages_sent": lambda: self.monitor.count_messages(subchat_id),
+            "runtime_seconds": lambda: self.state.get_runtime(subchat_id),
+            "transitions": lambda: self.state.get_state_transitions(subchat_id)
+        })
 
     # ------------------------------------------------------------
     # Batch Reporting
@@ -76,27 +145,41 @@ class SubchatReports:
     def build_all_subchats_overview(self) -> List[Dict[str, Any]]:
         """One overview entry per subchat."""
         IDs = self.monitor.list_all_subchats()
-        return [self.build_overview_report_for_id(_id) for _id in IDs]
+        overview = [self.build_overview_report_for_id(_id) for _id in IDs]
+        if len(self._overview_cache) > len(overview):
+            # forget subchats that no longer exist
+            live = set(IDs)
+            for stale in [sid for sid in self._overview_cache if sid not in live]:
+                del self._overview_cache[stale]
+        return overview
 
     def build_overview_report_for_id(self, subchat_id: str) -> Dict[str, Any]:
-        return {
-            "subchat_id": subchat_id,
-            "status": self.diagnostics.get_subchat_status(subchat_id),
-            "messages": self.monitor.count_messages(subchat_id),
-            "violations": self.audit.count_violations(subchat_id),
-            "runtime": self.state.get_runtime(subchat_id)
-        }
+        """Per-subchat overview; collaborator results are reused for `overview_ttl` seconds."""
+        return self._overview_view_for_id(subchat_id).to_dict()
+
+    def _overview_view_for_id(self, subchat_id: str) -> Mapping:
+        now = time.monotonic()
+        cached = self._overview_cache.get(subchat_id)
+        if cached is not None and now - cached[0] < self.overview_ttl:
+            return cached[1]
+        report = self._overview_cache[subchat_id] = (now, self._build_overview_for_id(subchat_id))
+        return report[1]
+
+    def _build_overview_for_id(self, subchat_id: str) -> Mapping:
+        return _LazyReport({"subchat_id": subchat_id}, {
+            "status": lambda: self.diagnostics.get_subchat_status(subchat_id),
+            "messages": lambda: self.monitor.count_messages(subchat_id),
+            "violations": lambda: self.audit.count_violations(subchat_id),
+            "runtime": lambda: self.state.get_runtime(subchat_id)
+        })
 
     # ------------------------------------------------------------
     # Structured Outputs
     # ------------------------------------------------------------
 
-    def export_report(self, report: Dict[str, Any]) -> str:
+    def export_report(self, report: Mapping) -> str:
         """
         Convert a report to a nicely formatted string
         (used for display in terminal/UI panels).
         """
-        lines = []
-        for key, value in report.items():
-            lines.append(f"{key}: {value}")
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join([f"{key}: {value}" for key, value in report.items()])
\ No newline at end of file
@@ -1,6 +1,70 @@
+import functools
 import json
+import mmap
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core._json import loads as _loads
+
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _ensure_dir(path: str) -> None:
+    """
+    One mkdir syscall in the common case (makedirs stats every level first);
+    parents are only created when missing. Not cached across instances, so a
+    folder removed in the meantime is recreated.
+    """
+    try:
+        os.mkdir(path)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+# Storage writes are disk-bound and release the GIL, so full restores fan out
+# across threads well beyond the core count.
+_RESTORE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# A directory listing is only cached once the directory's mtime is at least
+# this old, so a file added within the same (coarse) mtime tick is not missed.
+_LIST_CACHE_MIN_AGE_NS = 2_000_000_000
+
+# Backup decoders by file extension. JSON is always supported; binary
+# .msgpack backups are listed and restored only when msgpack is installed.
+_DESERIALIZERS: Dict[str, Callable[[bytes], Any]] = {".json": _loads}
+if msgpack is not None:
+    _DESERIALIZERS[".msgpack"] = _unpack
+
+
+def _may_contain_subchat_id(path: Path, subchat_id: str) -> bool:
+    """
+    Cheap pre-check for JSON backups: scans the raw bytes (via mmap) for
+    `"subchat_id": "<subchat_id>"` without parsing the document. False means
+    the backup definitely belongs to another SubChat; True only means a full
+    parse is needed to confirm. Ids that JSON would escape are not peeked.
+    """
+    if path.suffix != ".json" or not subchat_id.isascii() or json.dumps(subchat_id)[1:-1] != subchat_id:
+        return True
+    pattern = rb'"subchat_id"\s*:\s*"' + re.escape(subchat_id.encode("ascii")) + rb'"'
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return re.search(pattern, mm) is not None
+    except (OSError, ValueError):
+        # missing/empty file or mmap unavailable: let the normal load decide
+        return True
 
 
 class SubChatRestore:
@@ -11,27 +75,62 @@ class SubChatRestore:
 
     def __init__(self, backup_dir: str = "subchat_backups"):
         self.backup_dir = Path(backup_dir)
-        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(str(self.backup_dir))
+        # (directory mtime_ns, names newest -> oldest)
+        self._list_cache: Optional[Tuple[int, List[str]]] = None
+        # Parsed backups keyed by (name, mtime_ns, size): a changed file gets a new key.
+        self._backup_cache = functools.lru_cache(maxsize=4)(self._load_backup_uncached)
 
     def list_backups(self) -> list:
         """
         Returns a list of available backup files sorted newest → oldest.
+
+        The listing is cached against the directory's mtime, which changes
+        whenever a backup is added, removed or renamed; repeated calls then
+        cost a single stat.
         """
-        backups = sorted(self.backup_dir.glob("*.json"), key=lambda f: f.stat().st_mtime, reverse=True)
-        return [b.name for b in backups]
+        try:
+            dir_mtime = os.stat(self.backup_dir).st_mtime_ns
+        except FileNotFoundError:
+            self._list_cache = None
+            return []
+        cached = self._list_cache
+        if cached is not None and cached[0] == dir_mtime:
+            return list(cached[1])
+
+        with os.scandir(self.backup_dir) as it:
+            entries = [
+                (entry.stat().st_mtime, entry.name) for entry in it
+                if os.path.splitext(entry.name)[1] in _DESERIALIZERS and entry.is_file()
+            ]
+        entries.sort(key=lambda e: e[0], reverse=True)
+        names = [name for _, name in entries]
+
+        if time.time_ns() - dir_mtime >= _LIST_CACHE_MIN_AGE_NS:
+            self._list_cache = (dir_mtime, names)
+        return list(names)
 
     def load_backup(self, backup_name: str) -> Optional[dict]:
         """
         Loads a backup file and returns its data.
-        """
-        backup_path = self.backup_dir / backup_name
 
-        if not backup_path.exists():
+        Recently loaded backups are served from a small cache until the file
+        changes on disk, so the returned data is shared and must not be mutated.
+        """
+        try:
+            st = os.stat(self.backup_dir / backup_name)
+        except OSError:
             return None
+        return self._backup_cache(backup_name, st.st_mtime_ns, st.st_size)
+
+    def _load_backup_uncached(self, backup_name: str, mtime_ns: int, size: int) -> Optional[dict]:
+        backup_path = self.backup_dir / backup_name
+        decode = _DESERIALIZERS.get(backup_path.suffix, _loads)
 
         try:
-            with open(backup_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            # unbuffered: readall() sizes one read from fstat, no BufferedReader copy
+            with open(backup_path, "rb", buffering=0) as f:
+                return decode(f.readall())
         except Exception:
             return None
 
@@ -44,6 +143,10 @@ class SubChatRestore:
             backup_name: name of backup file
             storage_handler: instance of subchat_storage.SubChatStorage
         """
+        # Skip the full parse for backups that can't belong to this SubChat
+        if not _may_contain_subchat_id(self.backup_dir / backup_name, subchat_id):
+            return False
+
         data = self.load_backup(backup_name)
         if not data:
             return False
@@ -53,28 +156,47 @@ class SubChatRestore:
             return False
 
         try:
-            storage_handler.save_state(subchat_id, data.get("state", {}))
-            storage_handler.save_metadata(subchat_id, data.get("metadata", {}))
-            storage_handler.save_messages(subchat_id, data.get("messages", []))
+            self._write_subchat(storage_handler, subchat_id, data)
             return True
         except Exception:
             return False
 
+    @staticmethod
+    def _write_subchat(storage_handler, subchat_id: str, content: dict) -> None:
+        storage_handler.save_state(subchat_id, content.get("state", {}))
+        storage_handler.save_metadata(subchat_id, content.get("metadata", {}))
+        storage_handler.save_messages(subchat_id, content.get("messages", []))
+
     def full_restore(self, backup_name: str, storage_handler) -> bool:
         """
         Restores ALL SubChats present in a full-backup file.
         Only used when performing system-wide rollback.
+
+        SubChats are written in parallel; a failure in one does not stop the
+        others, but the restore as a whole then reports False.
         """
         data = self.load_backup(backup_name)
         if not data or "subchats" not in data:
             return False
 
         try:
-            for subchat_id, content in data["subchats"].items():
-                storage_handler.save_state(subchat_id, content.get("state", {}))
-                storage_handler.save_metadata(subchat_id, content.get("metadata", {}))
-                storage_handler.save_messages(subchat_id, content.get("messages", []))
-            return True
+            subchats = data["subchats"].items()
+            if len(subchats) <= 1:
+                for subchat_id, content in subchats:
+                    self._write_subchat(storage_handler, subchat_id, content)
+                return True
+
+            ok = True
+            with ThreadPoolExecutor(max_workers=min(_RESTORE_WORKERS, len(subchats)),
+                                    thread_name_prefix="subchat-restore") as pool:
+                futures = [
+                    pool.submit(self._write_subchat, storage_handler, subchat_id, content)
+                    for subchat_id, content in subchats
+                ]
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        ok = False
+            return ok
         except Exception:
             return False
 
@@ -23,6 +23,13 @@ class SubchatRouter:
         self.agent_permissions = agent_permissions
         self.logger = logger
 
+        # target -> handler; one dict lookup per message instead of an if-chain
+        self._dispatch = {
+            "agent": self._route_to_agent,
+            "subchat": self._route_to_subchat,
+            "primus": self._route_to_primus,
+        }
+
     # ----------------------------------------------------------------------
     # MAIN ENTRY POINT
     # ----------------------------------------------------------------------
@@ -40,7 +47,7 @@ class SubchatRouter:
         """
 
         origin = payload.get("from")
-        target = payload.get("target")
+        handler = self._dispatch.get(payload.get("target"))
 
         # --- Validate Permissions ------------------------------------------------
         if not self.agent_permissions.validate(payload):
@@ -49,14 +56,8 @@ class SubchatRouter:
         # ----------------------------------------------------------------------
         # Routing Logic
         # ----------------------------------------------------------------------
-        if target == "agent":
-            return self._route_to_agent(payload)
-
-        if target == "subchat":
-            return self._route_to_subchat(payload)
-
-        if target == "primus":
-            return self._route_to_primus(payload)
+        if handler is not None:
+            return handler(payload)
 
         return {"status": "error", "reason": "invalid target"}
 
@@ -17,6 +17,7 @@ This implementation is intentionally conservative and dependency-light:
 """
 
 from __future__ import annotations
+import functools
 import os
 import json
 import threading
@@ -55,6 +56,42 @@ except Exception:
     AgentInteractionLogger = None
 
 
+# One shared instance of each integration per process, created on first use.
+@functools.cache
+def _access_control():
+    return AccessControl() if AccessControl else None
+
+
+@functools.cache
+def _event_bus():
+    return SubChatEventBus() if SubChatEventBus else None
+
+
+@functools.cache
+def _interaction_logger():
+    return AgentInteractionLogger() if AgentInteractionLogger else None
+
+
+class _LazyIntegration:
+    """
+    Non-data descriptor: resolves an optional integration on first attribute
+    access and caches it on the instance. Routers that never touch e.g. the
+    event bus never construct it; assigning the attribute still overrides it.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.factory()
+        return value
+
+
 class SubchatRecord(dict):
     """
     Simple dict-like record for registered subchat metadata.
@@ -73,15 +110,16 @@ class SubchatRecord(dict):
 
 
 class SubchatRouterCore:
+    access_control = _LazyIntegration(_access_control)
+    event_bus = _LazyIntegration(_event_bus)
+    interaction_logger = _LazyIntegration(_interaction_logger)
+
     def __init__(self, config_path: Path = ROUTER_CONFIG_PATH, registry_path: Path = REGISTRY_PATH):
         self.config_path = Path(config_path)
         self.registry_path = Path(registry_path)
         self._lock = threading.RLock()
         self.config: Dict[str, Any] = {}
         self.registry: Dict[str, SubchatRecord] = {}
-        self.access_control = AccessControl() if AccessControl else None
-        self.event_bus = SubChatEventBus() if SubChatEventBus else None
-        self.interaction_logger = AgentInteractionLogger() if AgentInteractionLogger else None
 
         # load persisted state
         self._load_config()
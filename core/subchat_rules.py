@@ -4,19 +4,34 @@ Defines rule structures, templates, and default enforcement policies for Sub-Cha
 All other Sub-Chat components (validator, security, sandbox, orchestrator) depend on this.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import ClassVar, List, Dict, Mapping, Optional, Tuple
 
 
-@dataclass
+# Shared read-only default for Rule.conditions / Rule.metadata.
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _empty() -> Mapping:
+    return _EMPTY
+
+
+@dataclass(slots=True, frozen=True)
 class Rule:
-    """Defines a single rule and how it should be enforced."""
+    """
+    Defines a single rule and how it should be enforced.
+    Immutable: use SubchatRules.override_rule (or dataclasses.replace) to change one.
+    """
     id: str
     description: str
     severity: str = "medium"        # low / medium / high / critical
     allowed: bool = True
-    conditions: Dict = field(default_factory=dict)
-    metadata: Dict = field(default_factory=dict)
+    conditions: Mapping = field(default_factory=_empty)
+    metadata: Mapping = field(default_factory=_empty)
+
+
+_RULE_FIELDS = frozenset(f.name for f in fields(Rule))
 
 
 @dataclass
@@ -26,8 +41,12 @@ class RuleSet:
     rules: Dict[str, Rule] = field(default_factory=dict)
     inherits_from: Optional[str] = None  # allow hierarchical rule inheritance
 
+    # Bumped on every add_rule so SubchatRules knows its flattened views are stale.
+    generation: ClassVar[int] = 0
+
     def add_rule(self, rule: Rule):
         self.rules[rule.id] = rule
+        RuleSet.generation += 1
 
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         return self.rules.get(rule_id)
@@ -44,6 +63,9 @@ class SubchatRules:
 
     def __init__(self):
         self.rule_sets: Dict[str, RuleSet] = {}
+        # ruleset name -> (inheritance chain, rules flattened along it)
+        self._resolved: Dict[str, Tuple[Tuple[str, ...], Dict[str, Rule]]] = {}
+        self._resolved_generation = -1
         self._load_default_rules()
 
     # -------------------------------------------------------------------------
@@ -146,6 +168,9 @@ class SubchatRules:
 
         self.rule_sets["agent_default"] = agent_rules
 
+        for name in self.rule_sets:
+            self._resolve(name)
+
     # -------------------------------------------------------------------------
     # RULESET ACCESS
     # -------------------------------------------------------------------------
@@ -155,12 +180,56 @@ class SubchatRules:
     def list_rulesets(self) -> List[str]:
         return list(self.rule_sets.keys())
 
+    def _resolve(self, name: str) -> Optional[Dict[str, Rule]]:
+        """
+        Rules of `name` merged with everything it inherits (child rules win).
+        Flattened once per ruleset and cached until a ruleset in its chain changes.
+        """
+        if self._resolved_generation != RuleSet.generation:
+            self._resolved.clear()
+            self._resolved_generation = RuleSet.generation
+
+        cached = self._resolved.get(name)
+        if cached is not None:
+            return cached[1]
+
+        chain: List[RuleSet] = []
+        current = self.rule_sets.get(name)
+        while current is not None and current not in chain:
+            chain.append(current)
+            current = self.rule_sets.get(current.inherits_from) if current.inherits_from else None
+        if not chain:
+            return None
+
+        merged: Dict[str, Rule] = {}
+        for ruleset in reversed(chain):
+            merged.update(ruleset.rules)
+        self._resolved[name] = (tuple(rs.name for rs in chain), merged)
+        return merged
+
+    def _invalidate(self, ruleset_name: str):
+        """Drop flattened views whose inheritance chain includes `ruleset_name`."""
+        for name in [n for n, (chain, _) in self._resolved.items() if ruleset_name in chain]:
+            del self._resolved[name]
+
+    def get_rule(self, ruleset_name: str, rule_id: str) -> Optional[Rule]:
+        """Look up a rule in a ruleset, including rules it inherits."""
+        resolved = self._resolve(ruleset_name)
+        return resolved.get(rule_id) if resolved is not None else None
+
+    def resolve_rules(self, ruleset_name: str) -> Dict[str, Rule]:
+        """All rules in effect for a ruleset, inheritance applied."""
+        return dict(self._resolve(ruleset_name) or {})
+
     # -------------------------------------------------------------------------
     # CUSTOMIZATION
     # -------------------------------------------------------------------------
     def create_custom_ruleset(self, name: str, inherit_from: str = "global") -> RuleSet:
         ruleset = RuleSet(name=name, inherits_from=inherit_from)
         self.rule_sets[name] = ruleset
+        # A new ruleset can complete chains that previously ended on a missing
+        # parent (forward references), so drop every flattened view.
+        self._resolved.clear()
         return ruleset
 
     def override_rule(self, ruleset_name: str, rule_id: str, **updates):
@@ -169,12 +238,11 @@ class SubchatRules:
             return False
 
         rule = ruleset.get_rule(rule_id)
-        if not rule:
+        if not rule or not _RULE_FIELDS.issuperset(updates):
             return False
 
-        for k, v in updates.items():
-            setattr(rule, k, v)
-
+        ruleset.rules[rule_id] = replace(rule, **updates)
+        self._invalidate(ruleset_name)
         return True
 
 
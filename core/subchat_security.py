@@ -80,6 +80,9 @@ class SubchatSecurity:
         _ensure_storage()
         self._audit = audit_callback
         self._data = self._load_all()
+        # Bumped on every metadata save; callers may cache access decisions
+        # keyed on it (see SubchatLoader._can_read).
+        self.acl_version = 0
 
     # ----------------------------
     # Low-level I/O helpers
@@ -95,6 +98,7 @@ class SubchatSecurity:
         payload = data if data is not None else self._data
         payload.setdefault("subchats", {})
         self._data = payload
+        self.acl_version += 1
         _atomic_write(META_PATH, payload)
 
     def _get_subchat_meta(self, subchat_id: str) -> Optional[Dict[str, Any]]:
@@ -250,7 +254,11 @@ class SubchatSecurity:
     # ----------------------------
     # Permissions & access checks
     # ----------------------------
-    def _audit_access(self, subchat_id: str, actor_id: str, mode: str, allowed: bool):
+    def audit_access(self, subchat_id: str, actor_id: str, mode: str, allowed: bool):
+        """
+        Record an access decision. Public so callers that cache can_read/
+        can_write decisions (e.g. SubchatLoader) still audit every attempt.
+        """
         self._audit_event(
             {
                 "event": "subchat_access_attempt",
@@ -264,46 +272,46 @@ class SubchatSecurity:
     def can_read(self, subchat_id: str, actor_id: str, actor_role: str = "user") -> bool:
         meta = self._get_subchat_meta(subchat_id)
         if not meta:
-            self._audit_access(subchat_id, actor_id, "read", False)
+            self.audit_access(subchat_id, actor_id, "read", False)
             return False
         if actor_role in {"master", "admin"}:
-            self._audit_access(subchat_id, actor_id, "read", True)
+            self.audit_access(subchat_id, actor_id, "read", True)
             return True
         if actor_id == meta.get("owner"):
-            self._audit_access(subchat_id, actor_id, "read", True)
+            self.audit_access(subchat_id, actor_id, "read", True)
             return True
         if meta.get("is_private"):
             allowed = actor_id in (meta.get("allowed_agents") or [])
-            self._audit_access(subchat_id, actor_id, "read", allowed)
+            self.audit_access(subchat_id, actor_id, "read", allowed)
             return allowed
-        self._audit_access(subchat_id, actor_id, "read", True)
+        self.audit_access(subchat_id, actor_id, "read", True)
         return True
 
     def can_write(self, subchat_id: str, actor_id: str, actor_role: str = "user") -> bool:
         meta = self._get_subchat_meta(subchat_id)
         if not meta:
-            self._audit_access(subchat_id, actor_id, "write", False)
+            self.audit_access(subchat_id, actor_id, "write", False)
             return False
         if actor_role in {"master", "admin"}:
-            self._audit_access(subchat_id, actor_id, "write", True)
+            self.audit_access(subchat_id, actor_id, "write", True)
             return True
         if actor_id == meta.get("owner"):
-            self._audit_access(subchat_id, actor_id, "write", True)
+            self.audit_access(subchat_id, actor_id, "write", True)
             return True
         if meta.get("is_private"):
             allowed = actor_id in (meta.get("allowed_agents") or [])
         else:
             allowed = actor_id in (meta.get("allowed_agents") or [])
-        self._audit_access(subchat_id, actor_id, "write", allowed)
+        self.audit_access(subchat_id, actor_id, "write", allowed)
         return allowed
 
     def can_admin(self, subchat_id: str, actor_id: str, actor_role: str = "user") -> bool:
         meta = self._get_subchat_meta(subchat_id)
         if not meta:
-            self._audit_access(subchat_id, actor_id, "admin", False)
+            self.audit_access(subchat_id, actor_id, "admin", False)
             return False
         allowed = actor_role in {"master", "admin"} or actor_id == meta.get("owner")
-        self._audit_access(subchat_id, actor_id, "admin", allowed)
+        self.audit_access(subchat_id, actor_id, "admin", allowed)
         return allowed
 
     # ----------------------------
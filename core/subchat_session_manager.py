@@ -12,12 +12,14 @@ Responsibilities:
 
 from __future__ import annotations
 import json
+import time
 import hashlib
 import secrets
 import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timezone
+
+from core._persist import DebouncedWriter
 
 # Resolve paths relative to core folder
 CORE_DIR = Path(__file__).resolve().parents[0]
@@ -30,7 +32,12 @@ _LOCK = threading.RLock()
 
 
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Same output as datetime.now(timezone.utc).isoformat(), without building
+    # datetime objects: one clock read plus a C-level strftime.
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+    us = ns // 1000
+    return f"{stamp}.{us:06d}+00:00" if us else f"{stamp}+00:00"
 
 
 def _hash_password(pw: str, salt: Optional[str] = None) -> Dict[str, str]:
@@ -48,9 +55,12 @@ class SubChatSessionManager:
     Sessions are persisted to SESSIONS_PATH as JSON.
     """
 
-    def __init__(self, persist_path: Path = SESSIONS_PATH):
+    def __init__(self, persist_path: Path = SESSIONS_PATH, flush_interval_ms: int = 50):
         self._persist_path = persist_path
         self._sessions: Dict[str, Dict[str, Any]] = {}
+        # add_message only marks the store dirty; the writer coalesces each
+        # burst of messages into one _save per flush interval.
+        self._writer = DebouncedWriter(max(flush_interval_ms, 1) / 1000.0, self._save)
         self._load()
 
     # -------------------------
@@ -74,6 +84,8 @@ class SubChatSessionManager:
 
     def _save(self) -> None:
         with _LOCK:
+            # this write covers every deferred message, too
+            self._writer.discard()
             tmp = self._persist_path.with_suffix(".tmp")
             try:
                 with open(tmp, "w", encoding="utf-8") as f:
@@ -87,6 +99,14 @@ class SubChatSessionManager:
                     except Exception:
                         pass
 
+    def _schedule_save(self) -> None:
+        """Mark the store dirty; the writer saves once the burst settles."""
+        self._writer.schedule()
+
+    def flush(self) -> None:
+        """Persist any messages still waiting for the background flush."""
+        self._writer.flush()
+
     # -------------------------
     # Session lifecycle
     # -------------------------
@@ -203,16 +223,20 @@ class SubChatSessionManager:
         """
         Append message to session. Returns True on success.
         Message stored as {"ts", "sender", "content"}.
+
+        The message is visible immediately; writing it to disk is deferred to
+        the background flusher (call flush() to force it).
         """
         with _LOCK:
             s = self._sessions.get(session_id)
             if not s:
                 return False
-            msg = {"ts": _now_iso(), "sender": sender, "content": content}
+            now = _now_iso()
+            msg = {"ts": now, "sender": sender, "content": content}
             s.setdefault("messages", []).append(msg)
-            s["updated_at"] = _now_iso()
+            s["updated_at"] = now
             # Keep only recent N messages in memory? For now persist everything.
-            self._save()
+            self._schedule_save()
             return True
 
     def get_messages(self, session_id: str, limit: Optional[int] = None, require_private_access: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
@@ -0,0 +1,81 @@
+# test_subchat_memory.py
+# Round-trip checks for the JSONL memory log: every mutation must survive a reload.
+import json
+
+import pytest
+
+from core import subchat_memory
+from core.subchat_memory import SubChatMemory
+
+
+@pytest.fixture(autouse=True)
+def memory_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(subchat_memory, "MEMORY_DIR", tmp_path)
+    return tmp_path
+
+
+def _reload(mem):
+    return SubChatMemory(mem.subchat_id, mem.max_entries)
+
+
+def test_add_import_delete_round_trip(tmp_path):
+    mem = SubChatMemory("rt")
+    kept = mem.add_entry("kept", {"k": 1})
+    gone = mem.add_entry("gone")
+    mem.update_entry(kept["id"], content="kept v2")
+
+    src = tmp_path / "import.json"
+    src.write_text(json.dumps([
+        {"content": "a"},
+        {"content": "b"},
+        {"content": "c", "deleted": True},   # user data, not a tombstone
+        {"id": kept["id"], "content": "dup id"},
+    ]))
+    assert mem.import_json(str(src)) == {"status": "ok", "imported": 4}
+    assert mem.delete_entry(gone["id"])
+
+    before = mem.list_all()
+    after = _reload(mem).list_all()
+    assert after == before
+    assert [e["content"] for e in after] == ["kept v2", "a", "b", "c", "dup id"]
+    assert len({e["id"] for e in after}) == 5
+
+
+def test_import_rejects_non_dicts_without_mutating(tmp_path):
+    mem = SubChatMemory("bad")
+    mem.add_entry("x")
+    src = tmp_path / "bad.json"
+    src.write_text(json.dumps(["x", "y"]))
+
+    result = mem.import_json(str(src))
+    assert result["status"] == "error"
+    assert [e["content"] for e in mem.list_all()] == ["x"]
+    assert [e["content"] for e in _reload(mem).list_all()] == ["x"]
+
+
+def test_replace_import_without_ids_survives_reload(tmp_path):
+    mem = SubChatMemory("replace")
+    mem.add_entry("old")
+    src = tmp_path / "entries.json"
+    src.write_text(json.dumps([{"content": "a"}, {"content": "b"}, {"content": "c"}]))
+
+    assert mem.import_json(str(src), merge=False)["status"] == "ok"
+    assert [e["content"] for e in _reload(mem).list_all()] == ["a", "b", "c"]
+
+
+def test_legacy_file_migrates_without_losing_entries(memory_dir):
+    (memory_dir / "legacy.json").write_text(json.dumps([{"content": "a"}, {"content": "b"}, 5]))
+    mem = SubChatMemory("legacy")
+    assert [e["content"] for e in mem.list_all()] == ["a", "b"]
+    assert not (memory_dir / "legacy.json").exists()
+    assert [e["content"] for e in _reload(mem).list_all()] == ["a", "b"]
+
+
+def test_trim_past_max_entries_survives_later_delete():
+    mem = SubChatMemory("trim", 5)
+    added = [mem.add_entry(f"c{i}") for i in range(6)]
+    assert mem.delete_entry(added[5]["id"])
+
+    expected = ["c1", "c2", "c3", "c4"]
+    assert [e["content"] for e in mem.list_all()] == expected
+    assert [e["content"] for e in _reload(mem).list_all()] == expected